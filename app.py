@@ -1,11 +1,22 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
+import io
+import json
+import os
 import time
-import random
-import matplotlib.pyplot as plt
 from datetime import date, timedelta 
 
+import numpy as np
+import pandas as pd
+
+from engine import SHIPS, PLAN_DAYS, decoder_backend, index_rows, make_fleet, pso_scheduler
+from order_db import SharedOrderStore, open_database
+from jobs import JobRunner
+from local_search import local_search_scheduler
+from pricing import ROUTES, CLASS_TYPES, GOODS_TYPE, get_quote, mock_data_gen
+
+
+# Waktu render rerun ini, ditampilkan di panel Performance pada rerun berikutnya
+RENDER_START = time.perf_counter()
 
 # CONFIG & CONSTANTS
 st.set_page_config(layout="wide", page_title="Port Logistics AI", initial_sidebar_state="expanded")
@@ -26,259 +37,151 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Armada
-SHIPS = ["KM. Meratus Jaya", "KM. Tanto Line", "KM. SPIL Nusantara"]
-PLAN_DAYS = 3 
-
-# Rute
-ROUTES = {
-    "Tanjung Priok (JKT)":  {"dist": 0,    "rate": 2500, "days": 1},
-    "Soekarno-Hatta (MKS)": {"dist": 1400, "rate": 4800, "days": 4},
-    "Semayang (BPN)":       {"dist": 1200, "rate": 4200, "days": 3},
-    "Belawan (MDN)":        {"dist": 1800, "rate": 5800, "days": 5},
-    "Jayapura (DJJ)":       {"dist": 3700, "rate": 9800, "days": 12}
-}
-
-# 3 KELAS UTAMA
-CLASS_TYPES = {
-    "📦 KELAS C (Kecil - 1 Ton)": 1000,
-    "📦 KELAS B (Sedang - 20 Ton)": 20000,
-    "📦 KELAS A (Besar - 25 Ton)": 25000
-}
-
-GOODS_TYPE = ["General Cargo", "Electronics", "Textile", "FMCG", "Automotive Parts"]
-PPN = 0.11
+# Solver yang bisa dipilih di AI Control (antarmuka sama dengan pso_scheduler)
+SOLVER_ENGINES = {"PSO": pso_scheduler, "Local Search": local_search_scheduler}
 
+# Tabel besar ditampilkan per halaman agar rerun tidak mengirim seluruh antrian
+PAGE_SIZE = 200
 
-# HELPER FUNCTIONS
-
-
-def get_quote(route, weight, goods, is_priority):
-    route_info = ROUTES[route]
-    base_price = route_info["rate"] * weight
-    
-    surcharge = 0
-    if is_priority:
-        surcharge = 5000000 
-    elif "Electronics" in goods:
-        surcharge = base_price * 0.08 
-        
-    subtotal = base_price + surcharge
-    tax = subtotal * PPN
-    grand_total = subtotal + tax
-    return subtotal, tax, grand_total, route_info["days"]
-
-def mock_data_gen(n=20):
-    clients = ["PT. Indofood", "Mayora Group", "Unilever Indo", "Astra Honda", "Semen Gresik", "Wings Food", "Erajaya", "Gudang Garam"]
-    data = []
-    for _ in range(n):
-        c_name = random.choice(list(CLASS_TYPES.keys()))
-        qty = random.randint(1, 2)
-        weight = CLASS_TYPES[c_name] * qty
-        dest = random.choice(list(ROUTES.keys()))
-        item = random.choice(GOODS_TYPE)
-        
-        # Random priority (20% chance)
-        is_prio = random.random() < 0.2
-        
-        sub, tax, total, eta = get_quote(dest, weight, item, is_prio)
-        
-        data.append({
-            "id": 0, "client": random.choice(clients),
-            "item": item, "type": c_name, "qty": qty, 
-            "weight": weight, "dest": dest, "total": total, "eta": eta,
-            "is_priority": is_prio 
-        })
-    return data
-
-# FUNGSI MENGHITUNG KPI LOGISTIK
-def calculate_logistics_kpi(df_result, capacity_per_ship):
-    if df_result.empty:
-        return 0, 0, 0, 0
-
-    # 1. SERVICE LEVEL (Fill Rate)
-    total_orders = len(df_result)
-    success_orders = len(df_result[df_result['Day_Index'] != 99])
-    service_level = (success_orders / total_orders * 100) if total_orders > 0 else 0
-
-    # 2. PRIORITY COMPLIANCE
-    total_prio = len(df_result[df_result['is_priority'] == True])
-    success_prio = len(df_result[(df_result['is_priority'] == True) & (df_result['Day_Index'] == 1)])
-    
-    if total_prio > 0:
-        priority_compliance = (success_prio / total_prio * 100)
-    else:
-        priority_compliance = 100 
+# UI / FRONTEND
 
-    # 3. AVERAGE UTILIZATION
-    successful_trips = df_result[df_result['Day_Index'] != 99]
-    voyage_loads = successful_trips.groupby(['Day_Index', 'Ship'])['weight'].sum().reset_index()
-    voyage_loads['utilization'] = (voyage_loads['weight'] / capacity_per_ship) * 100
-    
-    if not voyage_loads.empty:
-        avg_utilization = voyage_loads['utilization'].mean()
+@st.cache_resource
+def get_database():
+    # Satu database order per proses server, dipakai bersama semua sesi
+    # (backend dan path dari ORDER_DB_BACKEND / ORDER_DB_PATH)
+    return open_database()
+
+
+@st.cache_resource
+def get_order_store():
+    # Satu replika antrian per proses server; sesi hanya membaca snapshot-nya
+    return SharedOrderStore(get_database())
+
+
+@st.cache_resource
+def get_job_runner():
+    # Runner job optimasi per proses server; sesi hanya menyimpan job id
+    return JobRunner()
+
+
+def apply_job_result(job):
+    # Salin hasil job ke session state sekali per job
+    if job.result is None or st.session_state.get('applied_job') == job.job_id:
+        return
+    st.session_state['applied_job'] = job.job_id
+    st.session_state['res'] = job.result["schedule"]
+    st.session_state['res_index'] = job.result["index"]
+    st.session_state['hist'] = job.result["history"]
+    st.session_state['profile'] = job.result["profile"]
+    # Key invalidasi tampilan turunan hasil (tabel stowage, penalti, grafik)
+    st.session_state['res_key'] = (job.job_id, job.params.get("capacity"))
+
+
+def reset_results():
+    # Hasil optimasi dan tampilan turunannya basi setelah antrian berubah
+    for key in ('res', 'res_index', 'profile', 'views'):
+        if key in st.session_state: del st.session_state[key]
+
+
+def cached_view(name, key, build):
+    # Tampilan turunan (tabel terformat, grafik) dibangun sekali per key dan
+    # disimpan di session state; rerun dengan key sama memakai ulang hasilnya
+    views = st.session_state.setdefault('views', {})
+    if name not in views or views[name][0] != key:
+        views[name] = (key, build())
+    return views[name][1]
+
+
+def page_slice(n_rows, key):
+    # Pemilih halaman untuk tabel > PAGE_SIZE baris; return slice halaman aktif
+    if n_rows <= PAGE_SIZE:
+        return slice(0, n_rows)
+    n_pages = -(-n_rows // PAGE_SIZE)
+    if st.session_state.get(key, 1) > n_pages:
+        st.session_state[key] = n_pages
+    page = st.number_input(f"Halaman (dari {n_pages:,})", min_value=1, max_value=n_pages, value=1, key=key)
+    start = (int(page) - 1) * PAGE_SIZE
+    stop = min(start + PAGE_SIZE, n_rows)
+    st.caption(f"Baris {start + 1:,}-{stop:,} dari {n_rows:,}")
+    return slice(start, stop)
+
+
+def format_number(values, prefix=""):
+    return [f"{prefix}{x:,.0f}" for x in np.asarray(values).tolist()]
+
+
+def raw_order_view(store, rows):
+    # Satu halaman daftar order, hanya baris halaman itu yang dibangun
+    frame = store.to_frame(rows=rows)
+    return pd.DataFrame({
+        'id': frame['id'],
+        'client': frame['client'],
+        'dest': frame['dest'],
+        'type': frame['type'],
+        'Priority': np.where(frame['is_priority'], "🔥 HIGH", "Normal"),
+        'Weight (Ton)': frame['weight'] / 1000,
+        'Total Price': format_number(frame['total'], "Rp "),
+    })
+
+
+def stowage_views(res, res_index):
+    # Tabel per voyage (hari, kapal) dan BACKLOG, sekali per hasil
+    views = {}
+    for day_idx in range(1, res_index["plan_days"] + 1):
+        for ship_idx in range(len(res_index["ships"])):
+            views[day_idx, ship_idx] = res.iloc[index_rows(res_index, day_idx, ship_idx)][['dest', 'type', 'Status']]
+    views[None] = res.iloc[index_rows(res_index)][['dest', 'type', 'Status']]
+    return views
+
+
+def penalty_view(res, res_index):
+    penalty_display = res.iloc[res_index["penalty_rows"]][
+        ['client', 'item', 'type', 'is_priority', 'Day_Index', 'Status', 'Penalty']].copy()
+    penalty_display['Penalty'] = format_number(penalty_display['Penalty'])
+    penalty_display['is_priority'] = np.where(penalty_display['is_priority'], "✅ YES", "NO")
+    return penalty_display
+
+
+def convergence_png(history):
+    # matplotlib baru di-import saat grafik pertama dibuat (import pyplot ~1.5 s);
+    # Figure langsung (tanpa pyplot) aman dipakai dari thread sesi mana pun
+    import io
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(4, 3))
+    ax = fig.subplots()
+    ax.plot(history, label='Penalty', color='#ff4b4b')
+    ax.set_title("Convergence")
+    ax.set_xlabel('Iterasi')
+    ax.set_ylabel('Penalty')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=100)
+    return buffer.getvalue()
+
+
+@st.fragment(run_every=1.0)
+def job_monitor(job_id):
+    # Poll progress job tanpa rerun seluruh halaman; rerun penuh saat job selesai
+    job = get_job_runner().get(job_id)
+    if job is None or not job.running:
+        st.rerun()
+    progress = job.progress
+    st.progress(progress["done"] / progress["total"] if progress["total"] else 0.0)
+    step_label = "Kapasitas" if job.kind == "sweep" else "Iterasi"
+    if progress["best_loss"] is not None:
+        st.caption(f"{step_label} {progress['done']}/{progress['total']} | Best Loss: {progress['best_loss']:,.0f} | {job.elapsed:.1f} s")
     else:
-        avg_utilization = 0
-
-    # 4. TOTAL COST / PENALTY
-    total_penalty = df_result['Penalty'].sum()
-
-    return service_level, priority_compliance, avg_utilization, total_penalty
-
-
-# PSO ALGORITHM
-
-
-def pso_scheduler(orders, capacity_per_ship, particles=20, iterations=30):
-    if not orders: return [], []
-    dim = len(orders)
-    w, c1, c2 = 0.7, 1.4, 1.4 
-    
-    X = [np.random.rand(dim) for _ in range(particles)]
-    V = [np.random.rand(dim) * 0.1 for _ in range(particles)]
-    
-    pbest_X = X[:]
-    pbest_score = [float('inf')] * particles
-    gbest_X = X[0]
-    gbest_score = float('inf')
-    loss_history = []
-
-    def calc_cost(position_vector):
-        queue = []
-        for i, val in enumerate(position_vector):
-            prio_score = val
-            if orders[i].get('is_priority', False):
-                prio_score += 10.0 
-            queue.append((prio_score, orders[i]))
-            
-        queue.sort(key=lambda x: x[0], reverse=True)
-        ship_loads = {d: [0]*len(SHIPS) for d in range(1, PLAN_DAYS + 2)}
-        total_penalty = 0
-        
-        for _, order in queue:
-            assigned = False
-            for day in range(1, PLAN_DAYS + 1):
-                current_day_loads = ship_loads[day]
-                best_ship_idx = current_day_loads.index(min(current_day_loads))
-                
-                if current_day_loads[best_ship_idx] + order['weight'] <= capacity_per_ship:
-                    ship_loads[day][best_ship_idx] += order['weight']
-                    delay = day - 1
-                    cost = (delay * order['weight']) / 1000 
-                    
-                    if order.get('is_priority', False) and delay > 0:
-                        cost += 5000000 
-                    
-                    total_penalty += cost
-                    assigned = True
-                    break
-            
-            if not assigned:
-                # [PERBAIKAN LOGIC PENALTY]
-                # Agar grafik tidak flat:
-                # 1. Denda dasar
-                base_penalty = (order['weight']/1000) * 10000 
-                
-                # 2. Jika Priority, denda SANGAT BESAR (Agar AI berusaha keras memasukkannya)
-                if order.get('is_priority', False):
-                    base_penalty *= 100  # Denda priority diperbesar 100x
-                
-                # 3. Tambahkan harga barang ke denda (Agar AI membuang barang murah dulu)
-                base_penalty += order['total'] / 500
-                
-                total_penalty += base_penalty
-        
-        # Load Balancing Penalty (opsional, kecil saja)
-        all_loads = [load for d in ship_loads for load in ship_loads[d]]
-        total_penalty += np.std(all_loads) / 1000 
-        
-        return total_penalty
+        st.caption(f"Menyiapkan optimasi... {job.elapsed:.1f} s")
+    if st.button("⏹️ Cancel", key=f"cancel-{job_id}", use_container_width=True):
+        job.cancel()
 
-    # Progress bar container
-    progress_bar = st.progress(0)
-    status_text = st.empty()
 
-    for i in range(iterations):
-        for p in range(particles):
-            r1, r2 = random.random(), random.random()
-            V[p] = w*V[p] + c1*r1*(pbest_X[p] - X[p]) + c2*r2*(gbest_X - X[p])
-            X[p] = np.clip(X[p] + V[p], 0, 1)
-            
-            score = calc_cost(X[p])
-            if score < pbest_score[p]:
-                pbest_score[p] = score
-                pbest_X[p] = X[p]
-                if score < gbest_score:
-                    gbest_score = score
-                    gbest_X = X[p]
-        loss_history.append(gbest_score)
-        
-        # Update progress visual
-        progress_bar.progress((i + 1) / iterations)
-        status_text.caption(f"Iterasi {i+1}/{iterations} | Best Loss: {gbest_score:,.0f}")
-    
-    final_schedule = []
-    final_queue = []
-    for i, val in enumerate(gbest_X):
-        is_prio = orders[i].get('is_priority', False)
-        prio_val = val + (10.0 if is_prio else 0)
-        final_queue.append((prio_val, orders[i]))
-    final_queue.sort(key=lambda x: x[0], reverse=True)
-    
-    loads = {d: [0]*len(SHIPS) for d in range(1, PLAN_DAYS + 2)}
-    today = date.today() 
-    
-    for _, order in final_queue:
-        assigned = False
-        for day in range(1, PLAN_DAYS + 1):
-            s_idx = loads[day].index(min(loads[day]))
-            if loads[day][s_idx] + order['weight'] <= capacity_per_ship:
-                loads[day][s_idx] += order['weight']
-                
-                ship_date = today + timedelta(days=day) 
-                date_str = ship_date.strftime("%d-%m-%Y")
-                
-                delay = day - 1
-                item_penalty = (delay * order['weight']) / 1000
-                
-                status = "On Schedule"
-                is_prio = order.get('is_priority', False)
-                
-                if is_prio:
-                    status = "🔥 PRIORITY" if day == 1 else "⚠️ LATE"
-                    if delay > 0: item_penalty += 5000000
-                elif day > 1:
-                    status = f"Reschedule (+{day}d)"
-                
-                final_schedule.append({
-                    **order, 
-                    "Day_Index": day, 
-                    "Tanggal": date_str, 
-                    "Ship": SHIPS[s_idx], 
-                    "Penalty": item_penalty,
-                    "Status": status
-                })
-                assigned = True
-                break
-        if not assigned:
-            # Display penalty yang sangat besar untuk visualisasi
-            disp_pen = 999999
-            if order.get('is_priority', False): disp_pen = 50000000
-            
-            final_schedule.append({
-                **order, 
-                "Day_Index": 99, 
-                "Tanggal": "TBD", 
-                "Ship": "BACKLOG", 
-                "Penalty": disp_pen,
-                "Status": "REJECTED"
-            })
-            
-    return pd.DataFrame(final_schedule), loss_history
-
-# UI / FRONTEND
-
-if 'db' not in st.session_state: st.session_state['db'] = []
+database = get_database()
+# Snapshot antrian bersama (O(1)); hanya order baru yang ditarik, sekali per proses
+orders = get_order_store().sync()
+if 'warm' not in st.session_state: st.session_state['warm'] = {}
 
 with st.sidebar:
     st.header("🚢 Logistic System")
@@ -297,6 +200,12 @@ with st.sidebar:
     
     # Konversi ke Kg untuk perhitungan backend
     CAPACITY_PER_SHIP_REAL = input_capacity_ton * 1000 
+
+    # Ukuran armada dan horizon perencanaan
+    n_ships = st.number_input("Jumlah Kapal", min_value=1, max_value=60, value=len(SHIPS))
+    plan_days = st.number_input("Horizon (Hari)", min_value=1, max_value=60, value=PLAN_DAYS)
+    FLEET = make_fleet(int(n_ships))
+    PLAN_HORIZON = int(plan_days)
     
     with st.expander("ℹ️ Lihat Asumsi Simulasi", expanded=False):
         st.markdown(f"""
@@ -306,34 +215,79 @@ with st.sidebar:
         **2. Weight-Only Constraint**
         Batasan kapasitas kapal saat ini: **{input_capacity_ton} Ton**.
         
-        **3. Fixed Horizon (3 Days)**
-        Order yang tidak muat dalam 3 hari dianggap **Backlog**.
+        **3. Fixed Horizon ({PLAN_HORIZON} Days)**
+        Order yang tidak muat dalam {PLAN_HORIZON} hari dianggap **Backlog**.
         """)
 
     if page == "Ops Dashboard":
         st.subheader("Dev Tools")
         if st.button("⚡ Generate 100 Mock Orders"):
-            new_data = mock_data_gen(100) 
-            for d in new_data:
-                d['id'] = len(st.session_state['db']) + 1
-                st.session_state['db'].append(d)
+            database.insert(mock_data_gen(100))
             st.success("100 Orders Injected!")
             time.sleep(0.5)
             st.rerun()
             
         # Tombol test extreme
         if st.button("🔥 Generate 300 Orders (Stress Test)"):
-            new_data = mock_data_gen(300) 
-            for d in new_data:
-                d['id'] = len(st.session_state['db']) + 1
-                st.session_state['db'].append(d)
+            database.insert(mock_data_gen(300))
             st.warning("300 Orders Injected! Pastikan menaikkan Kapasitas Kapal.")
             time.sleep(0.5)
             st.rerun()
+
+        # Load test: jumlah order bebas, harga dihitung batch
+        bulk_n = st.number_input("Jumlah Order (Load Test)", min_value=1, max_value=1_000_000, value=10_000, step=1000)
+        if st.button("📦 Generate Bulk Orders"):
+            database.insert(mock_data_gen(int(bulk_n)))
+            st.warning(f"{int(bulk_n):,} Orders Injected!")
+            time.sleep(0.5)
+            st.rerun()
             
+        # Import file export harian (CSV/JSONL), diproses per chunk
+        upload = st.file_uploader("Import Order (CSV/JSONL)", type=["csv", "jsonl", "ndjson", "json"])
+        if upload is not None and st.button("📥 Import File"):
+            from importer import import_orders
+
+            import_status = st.empty()
+            report = import_orders(
+                upload, database,
+                progress=lambda r: import_status.caption(f"{r['rows']:,} baris | {r['rows_per_s']:,.0f} baris/s"),
+            )
+            st.session_state['import_report'] = report
+            st.rerun()
+        if 'import_report' in st.session_state:
+            report = st.session_state['import_report']
+            st.caption(f"Import terakhir: {report['imported']:,} masuk, {report['rejected']:,} ditolak "
+                       f"({report['rows_per_s']:,.0f} baris/s)")
+            if report['errors']:
+                with st.expander("Baris ditolak", expanded=False):
+                    st.dataframe(report['errors'], hide_index=True)
+
+        # Backup / restore seluruh database (Parquet, termasuk status order)
+        if st.button("💾 Snapshot Parquet"):
+            buffer = io.BytesIO()
+            if database.snapshot_parquet(buffer):
+                st.session_state['snapshot'] = buffer.getvalue()
+            else:
+                st.info("Database kosong, tidak ada snapshot.")
+        if 'snapshot' in st.session_state:
+            st.download_button("⬇️ Download Snapshot", st.session_state['snapshot'],
+                               file_name="orders.parquet", mime="application/octet-stream")
+        snapshot_upload = st.file_uploader("Restore Snapshot (Parquet)", type=["parquet"])
+        if snapshot_upload is not None and st.button("♻️ Restore (ganti isi database)"):
+            database.clear()
+            st.session_state['restored'] = database.import_parquet(snapshot_upload)
+            st.session_state['warm'] = {}
+            reset_results()
+            st.rerun()
+        if 'restored' in st.session_state:
+            st.caption(f"Restore terakhir: {st.session_state['restored']:,} order")
+
         if st.button("🗑️ Flush Database"):
-            st.session_state['db'] = []
-            if 'res' in st.session_state: del st.session_state['res']
+            database.clear()
+            st.session_state['warm'] = {}
+            reset_results()
+            if 'job_id' in st.session_state: get_job_runner().cancel(st.session_state.pop('job_id'))
+            if 'sweep_job_id' in st.session_state: get_job_runner().cancel(st.session_state.pop('sweep_job_id'))
             st.rerun()
 
 # PAGE 1: CUSTOMER
@@ -383,13 +337,12 @@ if page == "Customer Booking":
             st.error("Nama Perusahaan wajib diisi!")
         else:
             payload = {
-                "id": len(st.session_state['db']) + 1,
                 "client": client, "item": item, "type": ctype,
                 "qty": qty, "weight": total_w, "dest": dest,
                 "total": grand_tot, "eta": eta,
                 "is_priority": is_priority 
             }
-            st.session_state['db'].append(payload)
+            payload["id"] = database.append(payload)
             st.success("Booking Confirmed! DO (Delivery Order) has been issued.")
             
             with st.expander("📄 View Invoice", expanded=True):
@@ -403,10 +356,11 @@ if page == "Customer Booking":
 # PAGE 2: ADMIN DASHBOARD
 elif page == "Ops Dashboard":
     st.title("⚓ Operations Control Tower")
-    df = st.session_state['db']
+    df = orders
     
-    total_ton = sum(x['weight'] for x in df) / 1000 if df else 0
-    est_rev = sum(x['total'] for x in df) if df else 0
+    # Running totals dari order store, tanpa scan ulang antrian
+    total_ton = df.total_weight / 1000
+    est_rev = df.total_revenue
     pending_count = len(df)
     
     col1, col2, col3 = st.columns(3)
@@ -425,15 +379,13 @@ elif page == "Ops Dashboard":
     if not df:
         st.info("Antrian kosong. Silakan generate order di sidebar.")
     else:
-        raw_df = pd.DataFrame(df)
-        
-        display_raw = raw_df[['id', 'client', 'dest', 'type', 'weight', 'total', 'is_priority']].copy()
-        display_raw['Priority'] = display_raw['is_priority'].apply(lambda x: "🔥 HIGH" if x else "Normal")
-        display_raw['Weight (Ton)'] = display_raw['weight'] / 1000
-        display_raw['Total Price'] = display_raw['total'].apply(lambda x: f"Rp {x:,.0f}")
+        # Halaman di-cache per versi order store (berubah saat ada order baru / flush)
+        raw_rows = page_slice(len(df), "raw_page")
+        display_raw = cached_view("raw", (df.version, raw_rows.start),
+                                  lambda: raw_order_view(df, raw_rows))
         
         st.dataframe(
-            display_raw[['id', 'client', 'dest', 'type', 'Priority', 'Weight (Ton)', 'Total Price']],
+            display_raw,
             use_container_width=True,
             hide_index=True,
             height=200 
@@ -446,30 +398,81 @@ elif page == "Ops Dashboard":
         
         with lc:
             st.subheader("⚙️ AI Control")
-            st.caption("Algorithm: PSO")
+            engine_name = st.selectbox("Solver Engine", list(SOLVER_ENGINES),
+                                       help="Local Search: greedy + move/swap dengan delta-cost O(1), jauh lebih cepat untuk antrian besar")
+            st.caption(f"Algorithm: {engine_name}")
             st.write("Optimasi muatan kapal dan prioritas.")
             
             # Info Kapasitas Aktif
             st.info(f"**Kapasitas Aktif:** {CAPACITY_PER_SHIP_REAL/1000:,.0f} Ton / Kapal")
 
+            # Mode anytime: batas waktu dan/atau berhenti saat konvergen
+            with st.expander("⏱️ Anytime Mode", expanded=False):
+                max_iter = st.number_input("Maks. Iterasi", min_value=1, max_value=10000, value=30)
+                time_budget = st.number_input("Batas Waktu (detik, 0 = off)", min_value=0.0, value=0.0, step=0.5)
+                patience = st.number_input("Stop jika tidak membaik selama N iterasi (0 = off)", min_value=0, value=0)
+
+            # Order identik (berat, prioritas, band harga) dioptimasi per kelas
+            engine_options = {}
+            if engine_name == "PSO":
+                compress = st.toggle("🧩 Kompresi Kelas Order", value=len(df) > 500,
+                                     help="PSO mengoptimasi blok kelas order, bukan tiap order; cocok untuk antrian besar")
+                low_memory = st.toggle("🪶 Low-Memory Mode", value=len(df) > 50_000,
+                                       help="Posisi float32, evaluasi per potongan dan hasil kolom kategorikal")
+                engine_options = {"warm_start": st.session_state['warm'], "compress": compress,
+                                  "low_memory": low_memory}
+
+            runner = get_job_runner()
+            job = runner.get(st.session_state.get('job_id'))
+            run_params = {"ships": len(FLEET), "plan_days": PLAN_HORIZON}
+
+            def start_job():
+                # df sudah snapshot: sync berikutnya tidak mengubah input job
+                new_job = runner.submit(
+                    df, CAPACITY_PER_SHIP_REAL, params=run_params,
+                    solver=SOLVER_ENGINES[engine_name],
+                    iterations=int(max_iter),
+                    time_limit=time_budget or None,
+                    patience=int(patience) or None,
+                    ships=FLEET,
+                    plan_days=PLAN_HORIZON,
+                    **engine_options,
+                )
+                st.session_state['job_id'] = new_job.job_id
+                return new_job
+
+            # Job yang masih jalan dengan kapasitas/armada lama sudah basi: ganti
+            if job is not None and job.running and job.params != dict(run_params, capacity=CAPACITY_PER_SHIP_REAL):
+                job.cancel()
+                job = start_job()
+
             if st.button("Run Optimization", type="primary", use_container_width=True):
-                with st.spinner("Calculating optimal stowage plan..."):
-                    time.sleep(0.5) 
-                    # Passing Capacity Real dari Slider ke PSO
-                    res_df, history = pso_scheduler(df, CAPACITY_PER_SHIP_REAL)
-                    st.session_state['res'] = res_df
-                    st.session_state['hist'] = history
-                st.success("Done!")
-            
+                if job is not None and job.running:
+                    job.cancel()
+                job = start_job()
+
+            if job is not None and job.running:
+                job_monitor(job.job_id)
+            elif job is not None:
+                apply_job_result(job)
+                if job.status == "failed":
+                    st.error("Optimasi gagal.")
+                    st.code(job.error)
+                elif job.result is not None and job.result["stats"]:
+                    run_stats = job.result["stats"]
+                    message = f"{run_stats['iterations']} iterasi, {run_stats['elapsed_s']:.2f} s, stop: {run_stats['stop_reason']}"
+                    if job.status == "cancelled":
+                        st.warning(f"Dibatalkan, hasil terbaik sejauh ini dipakai ({message})")
+                    else:
+                        st.success(f"Done! ({message})")
+
             # KPI BENCHMARK
             if 'res' in st.session_state:
-                res_df = st.session_state['res']
-                
-                # Panggil fungsi KPI baru dengan Capacity Real
-                srv_lvl, prio_rate, util, cost = calculate_logistics_kpi(res_df, CAPACITY_PER_SHIP_REAL)
+                # KPI sudah dihitung saat hasil dibuat (schedule_index)
+                srv_lvl, prio_rate, util, cost = st.session_state['res_index']['kpi']
                 
                 st.markdown("### 📊 Optimization KPIs")
-                st.caption("Benchmark performa algoritma PSO:")
+                st.caption("Benchmark performa solver:")
                 
                 # Baris 1: Kualitas Layanan
                 k1, k2 = st.columns(2)
@@ -489,53 +492,89 @@ elif page == "Ops Dashboard":
                 elif srv_lvl == 100:
                     st.success("✅ Semua terangkut!")
 
+                # Muatan hari 1 berangkat: order keluar dari antrian (status shipped)
+                if st.button("🚢 Berangkatkan Hari 1", use_container_width=True):
+                    res = st.session_state['res']
+                    database.set_status(res.loc[res['Day_Index'] == 1, 'id'].to_numpy(), "shipped")
+                    reset_results()
+                    st.rerun()
+
             # Grafik Cost
             if 'hist' in st.session_state:
                 st.markdown("### Cost Graph")
-                fig, ax = plt.subplots(figsize=(4,3))
-                ax.plot(st.session_state['hist'], label='Penalty', color='#ff4b4b')
-                ax.set_title("Convergence")
-                ax.set_xlabel('Iterasi')
-                ax.set_ylabel('Penalty')
-                ax.grid(True, alpha=0.3)
-                st.pyplot(fig)
+                st.image(cached_view("convergence", st.session_state.get('res_key'),
+                                     lambda: convergence_png(st.session_state['hist'])))
+
+            # Panel profiling run terakhir (timer per fase + counter)
+            if 'profile' in st.session_state:
+                profile = st.session_state['profile']
+                with st.expander("⚡ Performance", expanded=False):
+                    derived = profile["derived"]
+                    p1, p2 = st.columns(2)
+                    if 'moves_per_s' in derived:
+                        p1.metric("Moves/sec", f"{derived['moves_per_s']:,.0f}", help="Kandidat move/swap local search")
+                    else:
+                        p1.metric("Evals/sec", f"{derived.get('evals_per_s', 0):,.0f}")
+                    p2.metric("Cache Hit Rate", f"{derived['cache_hit_rate'] * 100:.1f}%" if 'cache_hit_rate' in derived else "-")
+                    st.dataframe(
+                        [{"Phase": name, "Time (s)": round(seconds, 4), "Calls": profile["calls"].get(name, 0)}
+                         for name, seconds in sorted(profile["timers"].items(), key=lambda kv: -kv[1])],
+                        hide_index=True, use_container_width=True,
+                    )
+                    st.caption(" | ".join(f"{name}: {n:,}" for name, n in profile["counters"].items()))
+                    if 'render_s' in st.session_state:
+                        st.caption(f"Render UI (rerun sebelumnya): {st.session_state['render_s']:.3f} s")
+                    if decoder_backend() != "numba":
+                        st.caption("⚠️ numba tidak terpasang: decoder memakai fallback Python (lambat)")
+                    st.download_button("⬇️ Export JSON", json.dumps(profile, indent=2),
+                                       file_name="profile.json", mime="application/json")
 
         with rc:
             st.subheader("📅 Stowage Plan (Jadwal)")
             if 'res' in st.session_state:
                 res = st.session_state['res']
+                res_index = st.session_state['res_index']
+                plan_ships, plan_horizon = res_index["ships"], res_index["plan_days"]
+                plan_capacity = res_index["capacity"]
+                res_key = st.session_state.get('res_key')
+                voyages = cached_view("stowage", res_key, lambda: stowage_views(res, res_index))
                 
                 today = date.today()
-                dates = [(today + timedelta(days=i+1)).strftime("%d %b %Y") for i in range(3)]
+                dates = [(today + timedelta(days=i+1)).strftime("%d %b %Y") for i in range(plan_horizon)]
                 
-                tab_labels = [f"{dates[0]} (Priority)", f"{dates[1]}", f"{dates[2]}", "BACKLOG"]
+                tab_labels = [f"{dates[0]} (Priority)"] + dates[1:] + ["BACKLOG"]
                 tabs = st.tabs(tab_labels)
                 
                 for i, tab in enumerate(tabs):
                     day_idx = i + 1
+                    is_day = day_idx <= plan_horizon
                     with tab:
-                        if day_idx < 4: daily_data = res[res['Day_Index'] == day_idx]
-                        else: daily_data = res[res['Day_Index'] == 99]
+                        if is_day: n_items = res_index["counts"][i].sum()
+                        else: n_items = res_index["n_backlog"]
                         
-                        if daily_data.empty: st.write("No operations scheduled.")
+                        if n_items == 0: st.write("No operations scheduled.")
                         else:
-                            cols = st.columns(len(SHIPS)) if day_idx < 4 else [st.container()]
-                            ship_names = SHIPS if day_idx < 4 else ["BACKLOG"]
-                            if day_idx == 4: st.error(f"Failed to load: {len(daily_data)} items")
+                            ship_names = plan_ships if is_day else ["BACKLOG"]
+                            if not is_day: st.error(f"Failed to load: {n_items} items")
+
+                            # Maks. 3 kapal per baris agar armada besar tetap terbaca
+                            cols = []
+                            for row_start in range(0, len(ship_names), 3):
+                                cols.extend(st.columns(3) if is_day else [st.container()])
 
                             for idx, s_name in enumerate(ship_names):
-                                with (cols[idx] if day_idx < 4 else st.container()):
-                                    s_data = daily_data[daily_data['Ship'] == s_name]
-                                    load = s_data['weight'].sum()
+                                with cols[idx]:
+                                    s_data = voyages[day_idx, idx] if is_day else voyages[None]
                                     st.markdown(f"**{s_name}**")
-                                    if day_idx < 4:
-                                        pct = load / CAPACITY_PER_SHIP_REAL
+                                    if is_day:
+                                        load = res_index["loads"][i, idx]
+                                        pct = load / plan_capacity
                                         st.progress(min(pct, 1.0))
-                                        st.caption(f"{load/1000:,.0f} / {CAPACITY_PER_SHIP_REAL/1000:,.0f} Ton ({pct*100:.1f}%)")
+                                        st.caption(f"{load/1000:,.0f} / {plan_capacity/1000:,.0f} Ton ({pct*100:.1f}%)")
                                     
                                     if not s_data.empty:
-                                        display_df = s_data[['dest', 'type', 'Status']].copy()
-                                        st.dataframe(display_df, hide_index=True, use_container_width=True)
+                                        rows = page_slice(len(s_data), f"voyage_page_{day_idx}_{idx}")
+                                        st.dataframe(s_data.iloc[rows], hide_index=True, use_container_width=True)
                                     else:
                                         st.markdown("*Idle*")
 
@@ -543,18 +582,58 @@ elif page == "Ops Dashboard":
                 st.divider()
                 st.subheader("⚠️ Penalty Analysis Report")
                 
-                penalty_df = res[res['Penalty'] > 0].copy().sort_values(by="Penalty", ascending=False)
-                
-                if not penalty_df.empty:
+                if len(res_index["penalty_rows"]):
                     st.write("Daftar barang yang terkena penalti (Tertunda atau Priority Late):")
                     
-                    penalty_display = penalty_df[['client', 'item', 'type', 'is_priority', 'Day_Index', 'Status', 'Penalty']].copy()
-                    penalty_display['Penalty'] = penalty_display['Penalty'].apply(lambda x: f"{x:,.0f}")
-                    penalty_display['is_priority'] = penalty_display['is_priority'].apply(lambda x: "✅ YES" if x else "NO")
-                    
-                    st.dataframe(penalty_display, use_container_width=True, hide_index=True)
+                    penalty_display = cached_view("penalty", res_key, lambda: penalty_view(res, res_index))
+                    rows = page_slice(len(penalty_display), "penalty_page")
+                    st.dataframe(penalty_display.iloc[rows], use_container_width=True, hide_index=True)
                 else:
                     st.success("🎉 Perfect Schedule! Tidak ada penalti.")
 
             else:
-                st.warning("Waiting for optimization trigger...")
\ No newline at end of file
+                st.warning("Waiting for optimization trigger...")
+
+        # CAPACITY SWEEP: satu aksi untuk seluruh rentang kapasitas
+        st.divider()
+        with st.expander("📈 Capacity Sweep (Kapasitas vs KPI)", expanded='sweep_job_id' in st.session_state):
+            s1, s2, s3 = st.columns(3)
+            sweep_range = s1.slider("Rentang Kapasitas (Ton)", 100, 5000, (100, 5000), step=100)
+            sweep_step = s2.number_input("Langkah (Ton)", min_value=50, max_value=2500, value=250, step=50)
+            sweep_workers = s3.number_input("Worker Paralel", min_value=1, max_value=32, value=os.cpu_count() or 1)
+            sweep_caps = [t * 1000 for t in range(sweep_range[0], sweep_range[1] + 1, int(sweep_step))]
+            st.caption(f"{len(sweep_caps)} titik kapasitas, tiap titik di-warm-start dari tetangganya.")
+
+            sweep_job = runner.get(st.session_state.get('sweep_job_id'))
+            if st.button("Run Sweep", use_container_width=True):
+                if sweep_job is not None and sweep_job.running:
+                    sweep_job.cancel()
+                sweep_job = runner.submit_sweep(
+                    df, sweep_caps, params=run_params,
+                    workers=int(sweep_workers),
+                    iterations=int(max_iter),
+                    ships=FLEET,
+                    plan_days=PLAN_HORIZON,
+                )
+                st.session_state['sweep_job_id'] = sweep_job.job_id
+
+            if sweep_job is not None and sweep_job.running:
+                job_monitor(sweep_job.job_id)
+            elif sweep_job is not None and sweep_job.status == "failed":
+                st.error("Sweep gagal.")
+                st.code(sweep_job.error)
+            elif sweep_job is not None and not sweep_job.result["curve"].empty:
+                curve = sweep_job.result["curve"].set_index("capacity_ton")
+                if sweep_job.status == "cancelled":
+                    st.warning("Sweep dibatalkan, kurva berisi titik yang sudah selesai.")
+                c1, c2 = st.columns(2)
+                with c1:
+                    st.caption("Service Level / Priority Compliance / Utilization (%)")
+                    st.line_chart(curve[["service_level", "priority_compliance", "utilization"]])
+                with c2:
+                    st.caption("Total Penalty")
+                    st.line_chart(curve[["penalty"]])
+                st.dataframe(curve, use_container_width=True)
+                st.download_button("⬇️ Export CSV", curve.to_csv(), file_name="capacity_sweep.csv", mime="text/csv")
+
+st.session_state['render_s'] = time.perf_counter() - RENDER_START
@@ -0,0 +1,205 @@
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+from engine import (
+    IslandPool, ScheduleCostCache, calculate_logistics_kpi, compile_orders, decoder_backend, evaluate_swarm,
+    pso_scheduler,
+)
+from local_search import local_search_scheduler
+from order_store import OrderStore
+from profiling import Profiler
+from pricing import ROUTE_NAMES, GOODS_TYPE, get_quote, get_quotes, mock_data_gen
+
+
+# BENCHMARK SUITE
+# Jalankan tanpa Streamlit:
+#   python benchmark.py --orders 100 1000 10000 --capacities 500 2000 --out bench.json
+# Setiap baris hasil berisi wall time, peak memory (tracemalloc), evals/sec dan
+# penalty akhir, supaya regresi dan mode solver bisa dibandingkan.
+
+# Mode solver yang dibandingkan: nama -> (fungsi solver, kwargs tambahan)
+SOLVERS = {
+    "pso": (pso_scheduler, {}),
+    "pso-islands": (pso_scheduler, {"islands": 4}),
+    # Island yang sama di IslandPool (--workers); dibandingkan dengan pso-islands untuk scaling
+    "pso-islands-parallel": (pso_scheduler, {"islands": 4}),
+    "pso-compressed": (pso_scheduler, {"compress": True}),
+    "pso-low-memory": (pso_scheduler, {"low_memory": True}),
+    "local-search": (local_search_scheduler, {}),
+}
+# Mode yang dijalankan sekali per IslandPool (satu baris per jumlah worker)
+PARALLEL_SOLVERS = {"pso-islands-parallel"}
+
+
+def measure(fn, *args, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+        wall = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, wall, peak
+
+
+def make_store(n_orders, seed):
+    store = OrderStore()
+    store.extend(mock_data_gen(n_orders, seed=seed))
+    return store
+
+
+def bench_pricing(n_orders, seed, scalar_limit):
+    rng = np.random.default_rng(seed)
+    routes = rng.integers(0, len(ROUTE_NAMES), n_orders)
+    goods = rng.integers(0, len(GOODS_TYPE), n_orders)
+    weights = rng.choice([1000, 2000, 20000, 25000, 40000, 50000], n_orders).astype(float)
+    prio = rng.random(n_orders) < 0.2
+
+    rows = []
+    _, wall, peak = measure(get_quotes, routes, weights, goods, prio)
+    rows.append({"bench": "get_quotes", "orders": n_orders, "wall_s": wall, "peak_bytes": peak,
+                 "orders_per_s": n_orders / wall if wall else None})
+
+    # get_quote skalar hanya sampai scalar_limit order (loop Python)
+    n_scalar = min(n_orders, scalar_limit)
+    route_names = [ROUTE_NAMES[r] for r in routes[:n_scalar]]
+    goods_names = [GOODS_TYPE[g] for g in goods[:n_scalar]]
+    args = list(zip(route_names, weights[:n_scalar].tolist(), goods_names, prio[:n_scalar].tolist()))
+    _, wall, peak = measure(lambda: [get_quote(*a) for a in args])
+    rows.append({"bench": "get_quote", "orders": n_scalar, "wall_s": wall, "peak_bytes": peak,
+                 "orders_per_s": n_scalar / wall if wall else None})
+    return rows
+
+
+def bench_evaluate(store, capacity, particles, seed):
+    compiled = compile_orders(store)
+    positions = np.random.default_rng(seed).random((particles, len(store)))
+    scores, wall, peak = measure(evaluate_swarm, positions, compiled, capacity)
+    return {"bench": "evaluate_swarm", "orders": len(store), "capacity_ton": capacity / 1000,
+            "particles": particles, "wall_s": wall, "peak_bytes": peak,
+            "evals_per_s": particles / wall if wall else None, "best_penalty": float(scores.min())}
+
+
+def bench_scheduler(store, capacity, particles, iterations, seed, solver, pool=None):
+    # pool: IslandPool yang sudah hangat untuk mode paralel, dipakai ulang antar
+    # baris agar spawn worker tidak ikut terukur
+    scheduler, options = SOLVERS[solver]
+    cache = ScheduleCostCache()
+    profiler = Profiler()
+    if pool is not None:
+        options = dict(options, pool=pool)
+    if scheduler is pso_scheduler:
+        options = dict(options, particles=particles, cache=cache)
+    (schedule, history), wall, peak = measure(
+        scheduler, store, capacity, iterations=iterations,
+        seed=seed, profiler=profiler, **options,
+    )
+    # evaluations = jadwal penuh yang di-decode (PSO); candidate_moves = kandidat
+    # delta O(1) local search. Laju keduanya tidak sebanding, jadi kolom terpisah.
+    evaluations = profiler.counters["evaluations"]
+    moves = profiler.counters["candidate_moves"]
+
+    kpis, kpi_wall, _ = measure(calculate_logistics_kpi, schedule, capacity)
+    service_level, priority_compliance, utilization, penalty = kpis
+    return {"bench": "scheduler", "solver": solver, "orders": len(store),
+            "workers": pool.workers if "pool" in options else 1,
+            "capacity_ton": capacity / 1000, "particles": particles, "iterations": iterations,
+            "wall_s": wall, "peak_bytes": peak, "evaluations": evaluations,
+            "evals_per_s": evaluations / wall if wall and evaluations else None,
+            "candidate_moves": moves, "moves_per_s": moves / wall if wall and moves else None,
+            "cache_hit_rate": cache.hit_rate, "final_loss": history[-1],
+            "kpi_wall_s": kpi_wall, "service_level": float(service_level),
+            "priority_compliance": float(priority_compliance),
+            "utilization": float(utilization), "penalty": float(penalty),
+            "profile": profiler.to_dict()}
+
+
+def numba_version():
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba.__version__
+
+
+def open_pools(workers, seed):
+    # Satu IslandPool per jumlah worker, dihangatkan sekali (spawn, import dan
+    # kompilasi decoder di setiap worker) sebelum pengukuran
+    pools = {}
+    warmup = make_store(100, seed)
+    for n in workers:
+        pools[n] = IslandPool(n)
+        pso_scheduler(warmup, 500000, islands=max(n, 2), iterations=1, pool=pools[n])
+    return pools
+
+
+def run(orders, capacities, particles, iterations, solvers, seed, scalar_limit, workers=(4,), log=print):
+    results = []
+    pools = open_pools(workers, seed) if PARALLEL_SOLVERS.intersection(solvers) else {}
+    try:
+        for n_orders in orders:
+            for row in bench_pricing(n_orders, seed, scalar_limit):
+                results.append(row)
+                log(row)
+
+            store = make_store(n_orders, seed)
+            for capacity_ton in capacities:
+                capacity = capacity_ton * 1000
+                row = bench_evaluate(store, capacity, particles, seed)
+                results.append(row)
+                log(row)
+                for solver in solvers:
+                    for pool in (pools.values() if solver in PARALLEL_SOLVERS else [None]):
+                        row = bench_scheduler(store, capacity, particles, iterations, seed, solver, pool)
+                        results.append(row)
+                        log(row)
+    finally:
+        for pool in pools.values():
+            pool.shutdown()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmark: scheduler, KPI dan pricing")
+    parser.add_argument("--orders", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--capacities", type=int, nargs="+", default=[500, 2000, 5000],
+                        help="Kapasitas per kapal dalam ton")
+    parser.add_argument("--particles", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--solvers", nargs="+", default=["pso"], choices=sorted(SOLVERS))
+    parser.add_argument("--workers", type=int, nargs="+", default=[4],
+                        help="Jumlah proses IslandPool untuk pso-islands-parallel (satu baris per nilai)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scalar-limit", type=int, default=100000,
+                        help="Batas jumlah order untuk benchmark get_quote skalar")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    decoder = decoder_backend()
+    if decoder != "numba":
+        print("numba tidak terpasang: decoder memakai fallback Python (lambat); pip install numba")
+
+    results = run(args.orders, args.capacities, args.particles, args.iterations,
+                  args.solvers, args.seed, args.scalar_limit, args.workers,
+                  log=lambda row: print(json.dumps(row)))
+    with open(args.out, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            # Decoder terkompilasi dipakai hanya jika numba terpasang
+            "numba": numba_version(),
+            "decoder": decoder,
+            "args": vars(args),
+            "results": results,
+        }, f, indent=2)
+    print(f"Saved {len(results)} results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
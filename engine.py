@@ -0,0 +1,953 @@
+import hashlib
+import itertools
+import math
+import multiprocessing as mp
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from order_store import OrderStore
+from profiling import Profiler
+
+
+# Armada (default; ukuran armada dan horizon bisa diatur per run)
+SHIPS = ["KM. Meratus Jaya", "KM. Tanto Line", "KM. SPIL Nusantara"]
+PLAN_DAYS = 3 
+
+
+def make_fleet(n_ships):
+    # Armada default diperpanjang dengan nama generik untuk kapal tambahan
+    return SHIPS[:n_ships] + [f"KM. Armada {i + 1}" for i in range(len(SHIPS), n_ships)]
+
+
+# FUNGSI MENGHITUNG KPI LOGISTIK
+def calculate_logistics_kpi(df_result, capacity_per_ship):
+    if df_result.empty:
+        return 0, 0, 0, 0
+
+    # Kode voyage (hari, kapal) untuk bincount, tanpa copy mask / groupby
+    day = df_result['Day_Index'].to_numpy()
+    ship_code, _ = pd.factorize(df_result['Ship'])
+    voyage = day.astype(np.int64) * (ship_code.max() + 1) + ship_code
+    return _logistics_kpi(
+        day, voyage,
+        df_result['is_priority'].to_numpy(dtype=bool),
+        df_result['weight'].to_numpy(dtype=float),
+        df_result['Penalty'].to_numpy(dtype=float),
+        capacity_per_ship,
+    )
+
+
+def _logistics_kpi(day, voyage, is_prio, weights, penalty, capacity_per_ship):
+    # 1. SERVICE LEVEL (Fill Rate)
+    shipped = day != 99
+    total_orders = len(day)
+    service_level = (np.count_nonzero(shipped) / total_orders * 100) if total_orders > 0 else 0
+
+    # 2. PRIORITY COMPLIANCE
+    total_prio = np.count_nonzero(is_prio)
+    success_prio = np.count_nonzero(is_prio & (day == 1))
+
+    if total_prio > 0:
+        priority_compliance = (success_prio / total_prio * 100)
+    else:
+        priority_compliance = 100 
+
+    # 3. AVERAGE UTILIZATION (rata-rata per voyage yang membawa muatan)
+    voyage_counts = np.bincount(voyage[shipped])
+    voyage_loads = np.bincount(voyage[shipped], weights=weights[shipped])
+    used = voyage_counts > 0
+
+    if used.any():
+        avg_utilization = (voyage_loads[used] / capacity_per_ship * 100).mean()
+    else:
+        avg_utilization = 0
+
+    # 4. TOTAL COST / PENALTY
+    total_penalty = penalty.sum()
+
+    return service_level, priority_compliance, avg_utilization, total_penalty
+
+
+def schedule_index(schedule, capacity_per_ship, ships=SHIPS, plan_days=PLAN_DAYS):
+    # Indeks hasil jadwal, dihitung sekali per hasil agar rerun dashboard tidak
+    # memindai ulang: baris dikelompokkan per (hari, kapal) lalu BACKLOG,
+    # ditambah beban per voyage, urutan laporan penalty dan KPI.
+    n_ships = len(ships)
+    n_groups = plan_days * n_ships + 1
+    day = schedule['Day_Index'].to_numpy()
+    ship_code = pd.Categorical(schedule['Ship'], categories=list(ships) + ["BACKLOG"]).codes
+    group = np.where(day == 99, n_groups - 1, (day - 1) * n_ships + ship_code)
+    weights = schedule['weight'].to_numpy(dtype=float)
+    penalty = schedule['Penalty'].to_numpy(dtype=float)
+
+    counts = np.bincount(group, minlength=n_groups)
+    loads = np.bincount(group, weights=weights, minlength=n_groups)
+    penalty_rows = np.flatnonzero(penalty > 0)
+    penalty_rows = penalty_rows[np.argsort(-penalty[penalty_rows], kind='stable')]
+
+    return {
+        "rows": np.argsort(group, kind='stable'),
+        "offsets": np.concatenate([[0], np.cumsum(counts)]),
+        "counts": counts[:-1].reshape(plan_days, n_ships),
+        "loads": loads[:-1].reshape(plan_days, n_ships),
+        "n_backlog": int(counts[-1]),
+        "penalty_rows": penalty_rows,
+        "ships": list(ships),
+        "plan_days": plan_days,
+        "capacity": capacity_per_ship,
+        "kpi": _logistics_kpi(day, group, schedule['is_priority'].to_numpy(dtype=bool),
+                              weights, penalty, capacity_per_ship),
+    }
+
+
+def index_rows(index, day_idx=None, ship_idx=None):
+    # Posisi baris untuk satu voyage (day_idx 1-based, ship_idx 0-based),
+    # atau BACKLOG jika day_idx None
+    if day_idx is None:
+        group = index["plan_days"] * len(index["ships"])
+    else:
+        group = (day_idx - 1) * len(index["ships"]) + ship_idx
+    return index["rows"][index["offsets"][group]:index["offsets"][group + 1]]
+
+
+# DECODER & COST
+
+
+def order_column(orders, name, dtype):
+    # `orders` boleh OrderStore (view tanpa copy) atau list of dict
+    if isinstance(orders, OrderStore):
+        return np.asarray(orders.column(name), dtype=dtype)
+    return np.array([o.get(name, 0) for o in orders], dtype=dtype)
+
+
+def order_frame(orders, rows=None, categorical=False):
+    # Hanya baris `rows` (urut sesuai rows) yang dibangun; index 0..n-1
+    if isinstance(orders, OrderStore):
+        return orders.to_frame(rows, categorical)
+    frame = pd.DataFrame(orders)
+    return frame if rows is None else frame.iloc[rows].reset_index(drop=True)
+
+
+def compile_orders(orders, ships=SHIPS, plan_days=PLAN_DAYS):
+    # Ekstrak kolom order sekali per run ke NumPy array; konfigurasi armada
+    # dan horizon ikut disimpan agar decoder, cost dan worker memakai yang sama
+    weights = order_column(orders, 'weight', float)
+    is_prio = order_column(orders, 'is_priority', bool)
+    totals = order_column(orders, 'total', float)
+
+    # [PERBAIKAN LOGIC PENALTY]
+    # Agar grafik tidak flat:
+    # 1. Denda dasar
+    # 2. Jika Priority, denda SANGAT BESAR (x100, agar AI berusaha keras memasukkannya)
+    # 3. Tambahkan harga barang ke denda (Agar AI membuang barang murah dulu)
+    reject_penalty = (weights / 1000) * 10000 * np.where(is_prio, 100, 1) + totals / 500
+
+    return {
+        "weight": weights,
+        "is_priority": is_prio,
+        "total": totals,
+        "prio_boost": is_prio * 10.0,
+        "reject_penalty": reject_penalty,
+        "ships": list(ships),
+        "plan_days": plan_days,
+    }
+
+
+# KOMPRESI KELAS
+# Order dengan berat, prioritas dan band harga yang sama praktis bisa saling
+# ditukar saat loading. Setiap kelas dipecah menjadi paling banyak
+# `blocks_per_class` blok berurutan (order termahal untuk ditolak di depan),
+# dan PSO cukup mengoptimasi satu posisi per blok. Antrian per-order didapat
+# dengan menderetkan isi blok sesuai urutan posisi blok.
+
+
+def compress_orders(compiled, price_bands=3, blocks_per_class=4):
+    # Return compiled baru dengan key tambahan "block_*"; dimensi PSO menjadi
+    # len(block_start) alih-alih jumlah order
+    weights, is_prio = compiled["weight"], compiled["is_priority"]
+    n = len(weights)
+    if n == 0:
+        return compiled
+
+    # Band harga berbasis kuantil total agar jumlah band tidak tergantung skala rupiah
+    edges = np.quantile(compiled["total"], np.linspace(0, 1, price_bands + 1)[1:-1])
+    band = np.searchsorted(edges, compiled["total"], side='right')
+    _, klass = np.unique(np.stack([weights, is_prio, band]), axis=1, return_inverse=True)
+    klass = klass.ravel()
+
+    # Di dalam kelas: reject_penalty terbesar duluan, lalu id asli (stable)
+    order = np.lexsort((-compiled["reject_penalty"], klass))
+    class_size = np.bincount(klass)
+    class_start = np.concatenate(([0], np.cumsum(class_size)[:-1]))
+    rank = np.arange(n) - class_start[klass[order]]
+
+    # Pecah kelas menjadi blok berukuran hampir sama
+    n_blocks = np.minimum(class_size, blocks_per_class)
+    block_base = np.concatenate(([0], np.cumsum(n_blocks)[:-1]))
+    sorted_class = klass[order]
+    block_of_sorted = block_base[sorted_class] + rank * n_blocks[sorted_class] // class_size[sorted_class]
+
+    block_size = np.bincount(block_of_sorted, minlength=int(n_blocks.sum()))
+    block_start = np.concatenate(([0], np.cumsum(block_size)[:-1]))
+    order_block = np.empty(n, dtype=np.intp)
+    order_block[order] = block_of_sorted
+    return dict(
+        compiled,
+        block_members=order,
+        block_start=block_start,
+        block_size=block_size,
+        block_boost=compiled["prio_boost"][order[block_start]],
+        order_block=order_block,
+    )
+
+
+def search_dim(compiled):
+    # Dimensi ruang cari PSO: jumlah blok jika terkompresi, jumlah order jika tidak
+    return len(compiled["block_size"]) if "block_size" in compiled else len(compiled["weight"])
+
+
+def expand_position(position, compiled):
+    # Posisi blok -> posisi per order (untuk warm start yang di-key per id order)
+    if "block_size" not in compiled:
+        return position
+    return np.asarray(position)[..., compiled["order_block"]]
+
+
+def compress_position(position, compiled):
+    # Posisi per order -> posisi blok (rata-rata anggota blok)
+    if "block_size" not in compiled:
+        return position
+    return np.bincount(compiled["order_block"], weights=position) / compiled["block_size"]
+
+
+def priority_queue(positions, compiled):
+    # Urutan antrian per partikel: posisi + boost prioritas, descending (stable)
+    positions = np.atleast_2d(positions)
+    if "block_size" not in compiled:
+        return np.argsort(-(positions + compiled["prio_boost"]), axis=1, kind='stable')
+
+    # Terkompresi: urutkan blok, lalu deretkan anggota setiap blok
+    block_order = np.argsort(-(positions + compiled["block_boost"]), axis=1, kind='stable')
+    sizes = compiled["block_size"][block_order]
+    placed_before = np.cumsum(sizes, axis=1) - sizes
+    n = len(compiled["block_members"])
+    shift = np.repeat((compiled["block_start"][block_order] - placed_before).ravel(), sizes.ravel())
+    return compiled["block_members"][shift.reshape(len(positions), n) + np.arange(n)]
+
+
+def decode_schedule(positions, compiled, capacity_per_ship):
+    # Greedy decoder untuk satu batch partikel (baris = partikel).
+    # Return: queue (urutan order), assigned_day (0-based, -1 = backlog),
+    # assigned_ship dan ship_loads dengan shape (particles, days, ships).
+    queue = priority_queue(positions, compiled)
+    return (queue,) + decode_queue(queue, compiled, capacity_per_ship)
+
+
+# Tanpa numba: batch dengan partikel * hari * kapal sampai batas ini di-decode
+# per partikel dengan loop Python di atas list (tanpa overhead panggilan NumPy
+# per order). Biaya loop per partikel naik dengan ukuran armada, sedangkan
+# decoder vektor lintas partikel punya biaya tetap per batch yang terbagi ke
+# semua partikel: 3 kapal x 3 hari tetap di loop sampai 200+ partikel, 40 x 30
+# hanya untuk 1 partikel. Jika numba terpasang semua batch memakai kernel
+# terkompilasi.
+SCALAR_CELLS = 2048
+
+# Kernel numba (opsional), dikompilasi sekali per proses saat pertama dipakai
+_JIT = {}
+
+
+def _decode_rows(queue_w, capacity_per_ship, n_ships, plan_days, assigned_day, assigned_ship, ship_loads):
+    # Greedy decoder per partikel: hari pertama yang kapal termuatnya masih
+    # cukup, lalu kapal termuat di hari itu; -1 = backlog. ship_loads per
+    # partikel datar (hari * n_ships + kapal). Bisa dijalankan di atas list
+    # (jalur Python) maupun array (dikompilasi numba) tanpa perubahan.
+    # Per order O(log hari + log kapal):
+    #   - min-heap kapal per hari, key (muatan, indeks kapal) agar seri tetap
+    #     jatuh ke kapal berindeks terkecil; muatan hanya naik, jadi cukup sift-down;
+    #   - segment tree minimum muatan kapal termuat per hari untuk mencari hari
+    #     pertama yang masih muat (daun padding = inf).
+    size = 1
+    while size < plan_days:
+        size *= 2
+    for p in range(len(queue_w)):
+        row_w, day_out, ship_out, loads = queue_w[p], assigned_day[p], assigned_ship[p], ship_loads[p]
+        heap = [0] * (plan_days * n_ships)
+        for j in range(plan_days * n_ships):
+            heap[j] = j % n_ships
+        tree = [math.inf] * (2 * size)
+        for d in range(plan_days):
+            tree[size + d] = 0.0
+        for node in range(size - 1, 0, -1):
+            tree[node] = min(tree[2 * node], tree[2 * node + 1])
+
+        for k in range(len(row_w)):
+            w = row_w[k]
+            room = capacity_per_ship - w
+            if tree[1] > room:
+                day_out[k] = -1
+                ship_out[k] = 0
+                continue
+            node = 1
+            while node < size:
+                node = 2 * node if tree[2 * node] <= room else 2 * node + 1
+            day = node - size
+
+            base = day * n_ships
+            ship = heap[base]
+            loads[base + ship] += w
+            load = loads[base + ship]
+            pos = 0
+            while True:
+                child = 2 * pos + 1
+                if child >= n_ships:
+                    break
+                c = heap[base + child]
+                if child + 1 < n_ships:
+                    c2 = heap[base + child + 1]
+                    if loads[base + c2] < loads[base + c] or (loads[base + c2] == loads[base + c] and c2 < c):
+                        child += 1
+                        c = c2
+                if loads[base + c] < load or (loads[base + c] == load and c < ship):
+                    heap[base + pos] = c
+                    pos = child
+                else:
+                    break
+            heap[base + pos] = ship
+
+            tree[node] = loads[base + heap[base]]
+            node //= 2
+            while node >= 1:
+                tree[node] = min(tree[2 * node], tree[2 * node + 1])
+                node //= 2
+            day_out[k] = day
+            ship_out[k] = ship
+
+
+def _jit_decoder():
+    if "decode" not in _JIT:
+        try:
+            import numba
+        except ImportError:
+            _JIT["decode"] = None
+        else:
+            _JIT["decode"] = numba.njit(cache=True)(_decode_rows)
+    return _JIT["decode"]
+
+
+def decoder_backend():
+    # "numba" atau "python" (fallback lambat: loop list / decoder vektor)
+    return "numba" if _jit_decoder() is not None else "python"
+
+
+def decode_queue(queue, compiled, capacity_per_ship):
+    n_particles, dim = queue.shape
+    n_ships = len(compiled["ships"])
+    plan_days = compiled["plan_days"]
+
+    kernel = _jit_decoder()
+    if kernel is not None:
+        assigned_day = np.empty((n_particles, dim), dtype=np.intp)
+        assigned_ship = np.empty((n_particles, dim), dtype=np.intp)
+        ship_loads = np.zeros((n_particles, plan_days * n_ships))
+        kernel(compiled["weight"][queue], float(capacity_per_ship), n_ships, plan_days,
+               assigned_day, assigned_ship, ship_loads)
+        return assigned_day, assigned_ship, ship_loads.reshape(n_particles, plan_days, n_ships)
+    if n_particles * plan_days * n_ships <= SCALAR_CELLS:
+        assigned_day = [[0] * dim for _ in range(n_particles)]
+        assigned_ship = [[0] * dim for _ in range(n_particles)]
+        ship_loads = [[0.0] * (plan_days * n_ships) for _ in range(n_particles)]
+        _decode_rows(compiled["weight"][queue].tolist(), capacity_per_ship, n_ships, plan_days,
+                     assigned_day, assigned_ship, ship_loads)
+        return (np.array(assigned_day, dtype=np.intp).reshape(n_particles, dim),
+                np.array(assigned_ship, dtype=np.intp).reshape(n_particles, dim),
+                np.array(ship_loads, dtype=float).reshape(n_particles, plan_days, n_ships))
+    return _decode_vectorized(queue, compiled, capacity_per_ship)
+
+
+def _decode_vectorized(queue, compiled, capacity_per_ship):
+    n_particles, dim = queue.shape
+    n_ships = len(compiled["ships"])
+    plan_days = compiled["plan_days"]
+    rows_per_particle = plan_days + 1
+
+    queue_w = compiled["weight"][queue]
+    room = capacity_per_ship - queue_w
+
+    # Indeks per (partikel, hari): day_min = muatan kapal paling ringan hari itu.
+    # Hari yang sudah terlalu penuh untuk order ini dilewati lewat satu
+    # perbandingan day_min <= room, tanpa memindai kapal satu per satu, jadi
+    # biaya per order hampir tidak bertambah saat armada/horizon membesar.
+    # Baris terakhir tiap partikel adalah BACKLOG: diisi -inf agar selalu "muat",
+    # sehingga argmax pertama jatuh ke sana jika tidak ada hari yang cukup.
+    ship_loads = np.zeros((n_particles * rows_per_particle, n_ships))
+    ship_loads[plan_days::rows_per_particle] = -np.inf
+    day_min = ship_loads.min(axis=1)
+    day_min_2d = day_min.reshape(n_particles, rows_per_particle)
+    row_base = np.arange(n_particles) * rows_per_particle
+
+    assigned_day = np.empty((n_particles, dim), dtype=np.intp)
+    assigned_ship = np.empty((n_particles, dim), dtype=np.intp)
+
+    for k in range(dim):
+        day = (day_min_2d <= room[:, k, None]).argmax(axis=1)
+        load_row = row_base + day
+        best_ship_idx = ship_loads[load_row].argmin(axis=1)
+        ship_loads[load_row, best_ship_idx] += queue_w[:, k]
+        day_min[load_row] = ship_loads[load_row].min(axis=1)
+        assigned_day[:, k] = day
+        assigned_ship[:, k] = best_ship_idx
+
+    assigned_day[assigned_day == plan_days] = -1
+    ship_loads = ship_loads.reshape(n_particles, rows_per_particle, n_ships)[:, :plan_days]
+    return assigned_day, assigned_ship, ship_loads
+
+
+def schedule_cost(compiled, queue, assigned_day, ship_loads):
+    assigned = assigned_day >= 0
+    delay = np.where(assigned, assigned_day, 0)
+    queue_w = compiled["weight"][queue]
+
+    total_penalty = (delay * queue_w).sum(axis=1) / 1000
+    total_penalty += 5000000 * (compiled["is_priority"][queue] & (delay > 0)).sum(axis=1)
+    total_penalty += np.where(assigned, 0, compiled["reject_penalty"][queue]).sum(axis=1)
+
+    # Load Balancing Penalty (opsional, kecil saja)
+    # Hari cadangan (plan_days + 1) tetap dihitung sebagai muatan nol.
+    n_particles, plan_days, n_ships = ship_loads.shape
+    all_loads = np.zeros((n_particles, (plan_days + 1) * n_ships))
+    all_loads[:, :plan_days * n_ships] = ship_loads.reshape(n_particles, -1)
+    total_penalty += all_loads.std(axis=1) / 1000
+
+    return total_penalty
+
+
+def build_schedule(orders, compiled, position, capacity_per_ship, categorical=False):
+    queue, assigned_day, assigned_ship, _ = decode_schedule(position, compiled, capacity_per_ship)
+    return schedule_frame(orders, compiled, queue[0], assigned_day[0], assigned_ship[0], categorical)
+
+
+def schedule_frame(orders, compiled, queue, assigned_day, assigned_ship, categorical=False):
+    # DataFrame jadwal dari satu penugasan (urut `queue`, day -1 = backlog);
+    # dipakai bersama oleh semua solver. categorical=True: kolom teks berupa
+    # pd.Categorical (kode int + kamus label dari order store), bukan string per baris.
+    schedule = order_frame(orders, queue, categorical)
+    assigned = assigned_day >= 0
+    day = np.where(assigned, assigned_day + 1, 99)
+    is_prio = compiled["is_priority"][queue]
+    weights = compiled["weight"][queue]
+
+    ships, plan_days = compiled["ships"], compiled["plan_days"]
+    today = date.today()
+    date_labels = np.array([(today + timedelta(days=d)).strftime("%d-%m-%Y") for d in range(1, plan_days + 1)] + ["TBD"])
+    ship_labels = np.array(ships + ["BACKLOG"])
+
+    # Display penalty yang sangat besar untuk backlog (visualisasi)
+    penalty = np.where(
+        assigned,
+        (day - 1) * weights / 1000 + np.where(is_prio & (day > 1), 5000000, 0),
+        np.where(is_prio, 50000000, 999999),
+    )
+
+    status = np.where(is_prio, np.where(day == 1, "🔥 PRIORITY", "⚠️ LATE"), "On Schedule").astype(object)
+    rescheduled = ~is_prio & (day > 1) & assigned
+    status[rescheduled] = [f"Reschedule (+{d}d)" for d in day[rescheduled]]
+    status[~assigned] = "REJECTED"
+
+    date_code = np.where(assigned, assigned_day, plan_days)
+    ship_code = np.where(assigned, assigned_ship, len(ships))
+    schedule["Day_Index"] = day
+    if categorical:
+        schedule["Tanggal"] = pd.Categorical.from_codes(date_code, date_labels)
+        schedule["Ship"] = pd.Categorical.from_codes(ship_code, ship_labels)
+    else:
+        schedule["Tanggal"] = date_labels[date_code]
+        schedule["Ship"] = ship_labels[ship_code]
+    schedule["Penalty"] = penalty
+    schedule["Status"] = pd.Categorical(status) if categorical else status
+    return schedule
+
+
+# COST CACHE
+# Biaya hanya bergantung pada permutasi hasil decode (bukan nilai float posisi),
+# jadi partikel yang konvergen ke urutan yang sama tidak perlu di-decode ulang.
+
+
+class ScheduleCostCache:
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @staticmethod
+    def key(queue_row, context):
+        # context: kapasitas (+ ukuran armada & horizon) yang menentukan biaya
+        digest = hashlib.blake2b(queue_row.tobytes(), digest_size=16)
+        digest.update(repr(context).encode())
+        return digest.digest()
+
+    def lookup(self, queue, context):
+        # Return key per baris dan skor (NaN untuk yang belum ada di cache)
+        keys = [self.key(row, context) for row in queue]
+        scores = np.full(len(keys), np.nan)
+        for p, key in enumerate(keys):
+            score = self._entries.get(key)
+            if score is not None:
+                self._entries.move_to_end(key)
+                scores[p] = score
+        found = int(np.count_nonzero(~np.isnan(scores)))
+        self.hits += found
+        self.misses += len(keys) - found
+        return keys, scores
+
+    def store(self, keys, scores):
+        for key, score in zip(keys, scores):
+            self._entries[key] = float(score)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def evaluate_swarm(positions, compiled, capacity_per_ship, cache=None, profiler=None):
+    # profiler: Profiler opsional; fase sort/cache_lookup/decode/cost diukur per batch
+    # compiled["eval_chunk"] (mode low-memory): partikel dievaluasi per potongan
+    # agar array sementara (chunk, dim) tidak tumbuh dengan jumlah partikel
+    chunk = compiled.get("eval_chunk")
+    if chunk and len(positions) > chunk:
+        return np.concatenate([
+            evaluate_swarm(positions[k:k + chunk], compiled, capacity_per_ship, cache, profiler)
+            for k in range(0, len(positions), chunk)
+        ])
+    profiler = profiler if profiler is not None else Profiler()
+    profiler.count("evaluations", len(positions))
+    with profiler.phase("sort"):
+        queue = priority_queue(positions, compiled)
+    if cache is None:
+        miss = np.ones(len(queue), dtype=bool)
+        scores = np.empty(len(queue))
+    else:
+        context = (capacity_per_ship, len(compiled["ships"]), compiled["plan_days"])
+        with profiler.phase("cache_lookup"):
+            keys, scores = cache.lookup(queue, context)
+        miss = np.isnan(scores)
+        profiler.count("cache_hits", int((~miss).sum()))
+        profiler.count("cache_misses", int(miss.sum()))
+
+    if miss.any():
+        profiler.count("decoded", int(miss.sum()))
+        with profiler.phase("decode"):
+            assigned_day, _, ship_loads = decode_queue(queue[miss], compiled, capacity_per_ship)
+        with profiler.phase("cost"):
+            scores[miss] = schedule_cost(compiled, queue[miss], assigned_day, ship_loads)
+        if cache is not None:
+            cache.store([k for k, m in zip(keys, miss) if m], scores[miss])
+    return scores
+
+
+def eval_chunk_size(n_orders, budget_bytes=128 * 2**20):
+    # Jumlah partikel per potongan evaluasi agar array sementara decoder
+    # (~6 array 8 byte per order per partikel) muat dalam `budget_bytes`
+    return max(1, budget_bytes // (48 * max(n_orders, 1)))
+
+
+# PSO ISLANDS
+# Setiap island adalah sub-swarm independen. Island bisa dijalankan di proses
+# terpisah (IslandPool) dan bertukar global best setiap `migration_interval` iterasi.
+
+# State run per proses worker: {run_id: {"compiled", "capacity", "cache", "islands"}}.
+# Island tinggal di worker selama run, jadi matriks X/V/pbest tidak dikirim per epoch.
+_WORKER_RUNS = {}
+
+
+def init_islands(dim, particles, islands=1, seed=None, start=None, start_score=None, spread=0.05,
+                 dtype=np.float64):
+    # Satu RNG independen per island agar hasil reproducible untuk seed yang sama,
+    # tidak tergantung urutan eksekusi di pool.
+    # Warm start: partikel 0 tepat di `start`, separuh swarm disebar tipis di
+    # sekitarnya dan sisanya tetap acak agar swarm tidak kehilangan eksplorasi.
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(islands)]
+    swarm = []
+    for rng in rngs:
+        X = rng.random((particles, dim), dtype=dtype)
+        if start is not None:
+            near = (particles + 1) // 2
+            X[:near] = np.clip(start + rng.normal(0, spread, (near, dim)), 0, 1)
+            X[0] = start
+        V = rng.random((particles, dim), dtype=dtype)
+        V *= 0.1
+        island = {
+            "X": X, "V": V,
+            "pbest_X": X.copy(),
+            "pbest_score": np.full(particles, np.inf),
+            "gbest_X": X[0].copy(),
+            "gbest_score": float('inf'),
+            "rng": rng,
+        }
+        if start_score is not None:
+            island["pbest_score"][0] = start_score
+            island["gbest_score"] = float(start_score)
+        swarm.append(island)
+    return swarm
+
+
+# WARM START
+# Memori warm start dimiliki pemanggil (mis. st.session_state) dengan bentuk
+# {capacity_per_ship: {"ids": array id order, "position": gbest_X}}.
+
+
+def warm_start_position(memory, orders, capacity_per_ship, seed=None):
+    # Posisi awal dari run sebelumnya untuk kapasitas yang sama: order lama
+    # memakai koordinat lamanya, order baru mendapat koordinat acak.
+    # Return None jika tidak ada order yang dikenali.
+    previous = (memory or {}).get(capacity_per_ship)
+    if previous is None or len(previous["ids"]) == 0:
+        return None
+
+    ids = order_column(orders, 'id', np.int64)
+    prev_ids = previous["ids"]
+    sorter = np.argsort(prev_ids, kind='stable')
+    slot = np.searchsorted(prev_ids, ids, sorter=sorter).clip(max=len(prev_ids) - 1)
+    known = prev_ids[sorter[slot]] == ids
+    if not known.any():
+        return None
+
+    position = np.random.default_rng(seed).random(len(orders))
+    position[known] = previous["position"][sorter[slot[known]]]
+    return position
+
+
+def remember_warm_start(memory, orders, capacity_per_ship, position):
+    memory[capacity_per_ship] = {
+        "ids": order_column(orders, 'id', np.int64).copy(),
+        "position": np.array(position, copy=True),
+    }
+
+
+def evolve_island(island, compiled, capacity_per_ship, iterations, cache=None, profiler=None,
+                  w=0.7, c1=1.4, c2=1.4):
+    X, V = island["X"], island["V"]
+    pbest_X, pbest_score = island["pbest_X"], island["pbest_score"]
+    rng = island["rng"]
+    particles = len(X)
+    history = []
+
+    # Update in-place dengan satu buffer kerja: tidak ada array (particles, dim)
+    # baru per iterasi, dan dtype X/V (float64 atau float32) dipertahankan
+    scratch = np.empty_like(X)
+    for _ in range(iterations):
+        r1 = rng.random((particles, 1))
+        r2 = rng.random((particles, 1))
+        V *= w
+        np.subtract(pbest_X, X, out=scratch)
+        scratch *= c1*r1
+        V += scratch
+        np.subtract(island["gbest_X"], X, out=scratch)
+        scratch *= c2*r2
+        V += scratch
+        X += V
+        np.clip(X, 0, 1, out=X)
+
+        scores = evaluate_swarm(X, compiled, capacity_per_ship, cache, profiler)
+        improved = scores < pbest_score
+        pbest_score[improved] = scores[improved]
+        pbest_X[improved] = X[improved]
+
+        best_p = int(pbest_score.argmin())
+        if pbest_score[best_p] < island["gbest_score"]:
+            island["gbest_score"] = float(pbest_score[best_p])
+            island["gbest_X"] = pbest_X[best_p].copy()
+        history.append(island["gbest_score"])
+
+    island["X"], island["V"] = X, V
+    return island, history
+
+
+def _load_islands(run_id, compiled, capacity_per_ship, cache_size, islands):
+    _WORKER_RUNS[run_id] = {
+        "compiled": compiled,
+        "capacity": capacity_per_ship,
+        "cache": ScheduleCostCache(cache_size) if cache_size else None,
+        "islands": islands,
+    }
+
+
+def _evolve_islands_task(run_id, iterations, migrants):
+    # migrants: {island: (gbest_X, gbest_score)} setelah migrasi di proses induk.
+    # Cache dan profiler hidup di worker; hanya gbest, history, selisih counter
+    # hit/miss dan ringkasan profil yang dikirim balik.
+    run = _WORKER_RUNS[run_id]
+    cache = run["cache"]
+    before = (cache.hits, cache.misses) if cache else (0, 0)
+    profiler = Profiler()
+    results = {}
+    for i, (gbest_X, gbest_score) in migrants.items():
+        island = run["islands"][i]
+        if gbest_score < island["gbest_score"]:
+            island["gbest_score"] = gbest_score
+            island["gbest_X"] = gbest_X
+        _, history = evolve_island(island, run["compiled"], run["capacity"], iterations, cache, profiler)
+        results[i] = (island["gbest_X"], island["gbest_score"], history)
+    after = (cache.hits, cache.misses) if cache else (0, 0)
+    return results, (after[0] - before[0], after[1] - before[1]), profiler.to_dict()
+
+
+def _release_islands(run_id):
+    _WORKER_RUNS.pop(run_id, None)
+
+
+class IslandPool:
+    # Worker proses persisten untuk mode island. Setiap worker adalah executor
+    # satu proses sehingga island i selalu tinggal di worker i % workers.
+    # Pool bisa dipakai ulang lintas run (pso_scheduler(pool=...)) agar biaya
+    # spawn tidak dibayar per panggilan; data order dikirim sekali per worker per run.
+    def __init__(self, workers):
+        # "spawn" karena proses induk (Streamlit) multi-thread; fork tidak aman di sana.
+        context = mp.get_context("spawn")
+        self._executors = [ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(workers)]
+        self._run_ids = itertools.count()
+
+    @property
+    def workers(self):
+        return len(self._executors)
+
+    def start(self, swarm, compiled, capacity_per_ship, cache_size=4096):
+        # Pindahkan island ke worker pemiliknya; return handle run
+        run_id = next(self._run_ids)
+        futures = [
+            executor.submit(_load_islands, run_id, compiled, capacity_per_ship, cache_size,
+                            {i: swarm[i] for i in range(w, len(swarm), self.workers)})
+            for w, executor in enumerate(self._executors[:len(swarm)])
+        ]
+        for future in futures:
+            future.result()
+        return _IslandRun(self, run_id)
+
+    def shutdown(self):
+        for executor in self._executors:
+            executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+
+
+class _IslandRun:
+    def __init__(self, pool, run_id):
+        self.pool = pool
+        self.run_id = run_id
+
+    def evolve(self, swarm, iterations):
+        # swarm di proses induk hanya berisi gbest per island
+        n = self.pool.workers
+        futures = [
+            executor.submit(_evolve_islands_task, self.run_id, iterations,
+                            {i: (swarm[i]["gbest_X"], swarm[i]["gbest_score"]) for i in range(w, len(swarm), n)})
+            for w, executor in enumerate(self.pool._executors[:len(swarm)])
+        ]
+        return [future.result() for future in futures]
+
+    def close(self):
+        for future in [executor.submit(_release_islands, self.run_id) for executor in self.pool._executors]:
+            future.result()
+
+
+def evolve_islands(swarm, compiled, capacity_per_ship, iterations, run=None, cache=None, profiler=None):
+    # run: _IslandRun (mode paralel) atau None (serial di proses ini)
+    if run is None:
+        results = [evolve_island(island, compiled, capacity_per_ship, iterations, cache, profiler)
+                   for island in swarm]
+        swarm = [island for island, _ in results]
+        histories = [hist for _, hist in results]
+    else:
+        swarm = list(swarm)
+        histories = []
+        for results, (hits, misses), profile in run.evolve(swarm, iterations):
+            for i, (gbest_X, gbest_score, hist) in results.items():
+                swarm[i] = {"gbest_X": gbest_X, "gbest_score": gbest_score}
+                histories.append(hist)
+            if cache is not None:
+                cache.hits += hits
+                cache.misses += misses
+            if profiler is not None:
+                profiler.merge(profile)
+    history = np.min(histories, axis=0).tolist()
+
+    # Migrasi: global best disebar ke semua island
+    best = best_island(swarm)
+    for island in swarm:
+        if best["gbest_score"] < island["gbest_score"]:
+            island["gbest_score"] = best["gbest_score"]
+            island["gbest_X"] = best["gbest_X"].copy()
+    return swarm, history
+
+
+def best_island(swarm):
+    return min(swarm, key=lambda island: island["gbest_score"])
+
+
+# PSO ALGORITHM
+
+
+def stalled(loss_history, patience, tol=0.0):
+    # True jika gbest tidak membaik lebih dari `tol` (relatif) selama
+    # `patience` iterasi terakhir
+    if patience is None or len(loss_history) <= patience:
+        return False
+    before, now = loss_history[-patience - 1], loss_history[-1]
+    return before - now <= tol * abs(before)
+
+
+class RunMonitor:
+    # Kondisi berhenti dan progress ter-throttle untuk solver anytime
+    # (pso_scheduler, local_search_scheduler). `check` dipanggil setelah setiap
+    # langkah dan mengembalikan alasan berhenti ("cancelled", "iterations",
+    # "time_limit", "stalled") atau None untuk lanjut.
+    def __init__(self, started, iterations, time_limit=None, patience=None, tol=0.0,
+                 cancel=None, progress=None, progress_interval=0.25, profiler=None):
+        self.started = started
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.patience = patience
+        self.tol = tol
+        self.cancel = cancel
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.last_report = time.monotonic()
+
+    def check(self, done, loss_history):
+        now = time.monotonic()
+        reason = None
+        if self.cancel is not None and self.cancel.is_set():
+            reason = "cancelled"
+        elif done >= self.iterations:
+            reason = "iterations"
+        elif self.time_limit is not None and now - self.started >= self.time_limit:
+            reason = "time_limit"
+        elif stalled(loss_history, self.patience, self.tol):
+            reason = "stalled"
+
+        if self.progress is not None and (reason is not None or now - self.last_report >= self.progress_interval):
+            with self.profiler.phase("ui"):
+                self.progress(done, self.iterations, loss_history[-1])
+            self.last_report = now
+        return reason
+
+
+def pso_scheduler(orders, capacity_per_ship, particles=20, iterations=30,
+                  islands=1, workers=None, pool=None, migration_interval=5, seed=None,
+                  progress=None, progress_interval=0.25, warm_start=None, cache=None,
+                  time_limit=None, patience=None, tol=0.0, stats=None,
+                  ships=SHIPS, plan_days=PLAN_DAYS, profiler=None, cancel=None,
+                  compress=False, blocks_per_class=4, low_memory=False, compiled=None):
+    # progress(done, iterations, best_loss) dipanggil paling sering sekali per
+    # `progress_interval` detik (plus sekali di akhir), agar UI tidak
+    # memperlambat iterasi.
+    # warm_start: dict memori milik pemanggil; run dimulai dari gbest terakhir
+    # untuk kapasitas yang sama dan hasilnya disimpan kembali ke sana.
+    # cache: ScheduleCostCache opsional (mis. untuk membaca counter hit/miss);
+    # jika None dibuat cache baru per run.
+    # Mode anytime: `iterations` adalah batas atas; run berhenti lebih awal jika
+    # `time_limit` (detik) habis atau gbest stagnan (lihat `stalled`). Jadwal
+    # terbaik sejauh ini selalu dikembalikan; alasan berhenti ditulis ke dict
+    # `stats` jika diberikan ("iterations", "time_limit", "stalled" atau "cancelled").
+    # profiler: Profiler opsional milik pemanggil untuk timer per fase dan
+    # counter (evaluasi, cache hit/miss); di mode paralel profil worker digabung.
+    # cancel: objek dengan is_set() (mis. threading.Event) yang dicek setiap
+    # epoch; jika di-set run berhenti dengan stop_reason "cancelled".
+    # compress: optimasi di level blok kelas order (lihat `compress_orders`)
+    # alih-alih satu dimensi per order; jadwal tetap dikembalikan per order.
+    # pool: IslandPool opsional milik pemanggil untuk mode island paralel, dipakai
+    # ulang lintas panggilan; tanpa pool, `workers` > 0 membuat pool sementara.
+    # low_memory: posisi/kecepatan float32, evaluasi per potongan partikel dan
+    # jadwal dengan kolom teks kategorikal yang merujuk kamus order store, agar
+    # memori puncak tetap kelipatan tetap dari ukuran input.
+    # compiled: hasil compile_orders (opsional sudah compress_orders) untuk
+    # `orders`, `ships` dan `plan_days` yang sama, mis. dipakai ulang lintas
+    # kapasitas; langkah compile dilewati dan dict pemanggil tidak diubah.
+    started = time.monotonic()
+    if not orders: return [], []
+    loss_history = []
+
+    if profiler is None:
+        profiler = Profiler()
+    with profiler.phase("compile"):
+        if compiled is None:
+            compiled = compile_orders(orders, ships, plan_days)
+        if compress and "block_size" not in compiled:
+            compiled = compress_orders(compiled, blocks_per_class=blocks_per_class)
+        if low_memory:
+            compiled = dict(compiled, eval_chunk=eval_chunk_size(len(compiled["weight"])))
+    dim = search_dim(compiled)
+    if cache is None:
+        cache = ScheduleCostCache()
+
+    start = start_score = None
+    if warm_start is not None:
+        start = warm_start_position(warm_start, orders, capacity_per_ship, seed)
+    if start is not None:
+        start = compress_position(start, compiled)
+        queue, assigned_day, _, ship_loads = decode_schedule(start, compiled, capacity_per_ship)
+        start_score = schedule_cost(compiled, queue, assigned_day, ship_loads)[0]
+    swarm = init_islands(dim, particles, islands, seed, start, start_score,
+                         dtype=np.float32 if low_memory else np.float64)
+
+    # Mode paralel: island dijalankan di IslandPool milik pemanggil (`pool`) atau
+    # pool sementara dengan `workers` proses; di proses induk swarm tinggal gbest
+    own_pool = run = None
+    if islands > 1 and pool is None and workers:
+        pool = own_pool = IslandPool(workers)
+    if islands > 1 and pool is not None:
+        run = pool.start(swarm, compiled, capacity_per_ship, cache.maxsize)
+        swarm = [{"gbest_X": island["gbest_X"], "gbest_score": island["gbest_score"]} for island in swarm]
+    epoch = migration_interval if islands > 1 else 1
+
+    stop_reason = None
+    try:
+        done = 0
+        monitor = RunMonitor(started, iterations, time_limit, patience, tol,
+                             cancel, progress, progress_interval, profiler)
+        while stop_reason is None:
+            steps = min(epoch, iterations - done)
+            with profiler.phase("optimize"):
+                swarm, history = evolve_islands(swarm, compiled, capacity_per_ship, steps, run, cache, profiler)
+            loss_history.extend(history)
+            done += steps
+            stop_reason = monitor.check(done, loss_history)
+    finally:
+        if run is not None:
+            run.close()
+        if own_pool is not None:
+            own_pool.shutdown()
+
+    gbest_X = best_island(swarm)["gbest_X"]
+    if warm_start is not None:
+        remember_warm_start(warm_start, orders, capacity_per_ship, expand_position(gbest_X, compiled))
+    with profiler.phase("build_schedule"):
+        schedule = build_schedule(orders, compiled, gbest_X, capacity_per_ship, categorical=low_memory)
+
+    if stats is not None:
+        stats.update({
+            "stop_reason": stop_reason,
+            "iterations": done,
+            "elapsed_s": time.monotonic() - started,
+            "best_loss": loss_history[-1],
+            "dim": dim,
+        })
+    return schedule, loss_history
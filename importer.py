@@ -0,0 +1,144 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from order_db import DEFAULT_PATH, open_database
+from pricing import CLASS_NAMES, CLASS_WEIGHTS, GOODS_TYPE, ROUTE_NAMES, get_quotes
+
+
+# BULK IMPORT
+# Import order dari file CSV / JSONL per chunk: validasi dest/type/item/qty,
+# harga dihitung batch dengan get_quotes (rumus sama dengan form booking),
+# lalu langsung ditulis ke database order atau OrderStore. Memori dibatasi
+# oleh `chunk_size`, bukan ukuran file.
+#   python importer.py orders.csv --db orders.db --chunk-size 50000
+
+REQUIRED_COLUMNS = ["client", "dest", "type", "item", "qty"]
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+# Batas unit per order, sama dengan form booking (juga mencegah overflow int32)
+MAX_QTY = 50
+MAX_ERRORS = 20
+
+
+def read_chunks(source, fmt=None, chunk_size=50000):
+    # `source` berupa path atau file-like; format ditebak dari ekstensi
+    if fmt is None:
+        name = str(getattr(source, "name", source)).lower()
+        fmt = "jsonl" if name.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+    if fmt == "csv":
+        return pd.read_csv(source, chunksize=chunk_size, dtype=str, keep_default_na=False,
+                           skipinitialspace=True)
+    if fmt == "jsonl":
+        return pd.read_json(source, lines=True, chunksize=chunk_size, dtype=False)
+    raise ValueError(f"Format tidak dikenal: {fmt}")
+
+
+def categorize(values, names):
+    # Nilai di luar `names` mendapat kode -1 (tidak valid)
+    return pd.Categorical.from_codes(pd.Index(names).get_indexer(values), names)
+
+
+def parse_chunk(chunk):
+    # Return (columns siap OrderStore.extend, mask baris valid, alasan per baris)
+    n = len(chunk)
+    missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(missing)}")
+
+    # Nilai kosong (null JSON / key tidak ada) menjadi "" agar ikut ditolak
+    # validasi; astype(str) saja membiarkan NaN lolos
+    text = {name: chunk[name].fillna("").astype(str).str.strip() for name in ["client", "dest", "type", "item"]}
+    dest = categorize(text["dest"], ROUTE_NAMES)
+    ctype = categorize(text["type"], CLASS_NAMES)
+    item = categorize(text["item"], GOODS_TYPE)
+    qty = pd.to_numeric(chunk["qty"], errors="coerce").to_numpy(dtype=float)
+    if "is_priority" in chunk.columns:
+        is_prio = chunk["is_priority"].astype(str).str.strip().str.lower().isin(TRUE_VALUES).to_numpy()
+    else:
+        is_prio = np.zeros(n, dtype=bool)
+
+    reasons = np.full(n, "", dtype=object)
+    checks = [
+        (text["client"].to_numpy() == "", "client kosong"),
+        (np.isnan(qty) | (qty < 1) | (qty != np.floor(qty)), "qty bukan bilangan bulat >= 1"),
+        (qty > MAX_QTY, f"qty terlalu besar (maks. {MAX_QTY})"),
+        (item.codes < 0, "item tidak dikenal"),
+        (ctype.codes < 0, "type tidak dikenal"),
+        (dest.codes < 0, "dest tidak dikenal"),
+    ]
+    # Alasan pertama yang gagal dipakai (urutan `checks`)
+    for bad, reason in checks:
+        reasons[bad & (reasons == "")] = reason
+    valid = reasons == ""
+
+    qty = np.where(valid, qty, 0).astype(np.int32)
+    weight = CLASS_WEIGHTS[ctype.codes[valid]] * qty[valid]
+    _, _, total, eta = get_quotes(dest.codes[valid], weight, item.codes[valid], is_prio[valid])
+
+    columns = {
+        "id": np.zeros(int(valid.sum()), dtype=np.int64),
+        "client": pd.Categorical(text["client"].to_numpy()[valid]),
+        "item": item[valid],
+        "type": ctype[valid],
+        "qty": qty[valid],
+        "weight": weight,
+        "dest": dest[valid],
+        "total": total,
+        "eta": eta,
+        "is_priority": is_prio[valid],
+    }
+    return columns, valid, reasons
+
+
+def import_orders(source, target, fmt=None, chunk_size=50000, progress=None):
+    # target: database order (insert), OrderStore (extend) atau None (validasi saja).
+    # progress(report) dipanggil setelah setiap chunk. Return report dict:
+    # rows, imported, rejected, errors (maks. MAX_ERRORS contoh), elapsed_s, rows_per_s.
+    if target is None:
+        write = None
+    else:
+        write = target.insert if hasattr(target, "insert") else target.extend
+    started = time.perf_counter()
+    report = {"rows": 0, "imported": 0, "rejected": 0, "errors": [], "elapsed_s": 0.0, "rows_per_s": 0.0}
+
+    for chunk in read_chunks(source, fmt, chunk_size):
+        columns, valid, reasons = parse_chunk(chunk)
+        if write is not None and valid.any():
+            write(columns)
+
+        # Nomor baris 1-based pada data (tanpa header)
+        bad = np.flatnonzero(~valid)
+        room = MAX_ERRORS - len(report["errors"])
+        report["errors"].extend({"row": report["rows"] + int(k) + 1, "reason": reasons[k]} for k in bad[:room])
+        report["rows"] += len(chunk)
+        report["imported"] += int(valid.sum())
+        report["rejected"] += len(bad)
+
+        report["elapsed_s"] = time.perf_counter() - started
+        report["rows_per_s"] = report["rows"] / report["elapsed_s"] if report["elapsed_s"] else 0.0
+        if progress is not None:
+            progress(report)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import order bulk dari CSV/JSONL")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="Path database SQLite order")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--dry-run", action="store_true", help="Validasi saja, tidak menulis ke database")
+    args = parser.parse_args(argv)
+
+    target = None if args.dry_run else open_database(args.db)
+    for path in args.files:
+        report = import_orders(path, target, args.format, args.chunk_size,
+                               progress=lambda r: print(f"{path}: {r['rows']:,} baris, {r['rows_per_s']:,.0f} baris/s"))
+        print(json.dumps({"file": path, **report}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+
+from engine import PLAN_DAYS, SHIPS, pso_scheduler, schedule_index
+from profiling import Profiler
+from sweep import capacity_sweep
+
+
+# BACKGROUND JOBS
+# Optimasi dijalankan di thread terpisah agar script Streamlit tidak terblokir.
+# Runner dimiliki proses server (st.cache_resource); sesi hanya menyimpan job id
+# dan mem-poll `progress` / `status` sampai job selesai.
+
+
+class OptimizationJob:
+    def __init__(self, job_id, params, kind="optimize"):
+        self.job_id = job_id
+        # "optimize" (satu jadwal) atau "sweep" (kurva KPI per kapasitas)
+        self.kind = kind
+        # Parameter yang menentukan validitas hasil (kapasitas, armada, horizon)
+        self.params = params
+        self.status = "running"
+        self.progress = {"done": 0, "total": 0, "best_loss": None}
+        self.result = None
+        self.error = None
+        self.started = time.monotonic()
+        self.finished = None
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self.status == "running"
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _report(self, done, total, best_loss):
+        # Dipanggil dari thread job; cukup satu assignment dict (atomik di CPython)
+        self.progress = {"done": done, "total": total, "best_loss": best_loss}
+
+    def _run(self, work):
+        # work(job) -> dict hasil; dijalankan di thread job
+        try:
+            self.result = work(self)
+            self.status = "cancelled" if self._cancel.is_set() else "done"
+        except Exception:
+            self.error = traceback.format_exc()
+            self.status = "failed"
+        finally:
+            self.finished = time.monotonic()
+
+
+def _optimize(solver, orders, capacity_per_ship, kwargs):
+    def work(job):
+        stats = {}
+        profiler = Profiler()
+        schedule, history = solver(
+            orders, capacity_per_ship, progress=job._report, cancel=job._cancel,
+            stats=stats, profiler=profiler, **kwargs,
+        )
+        # Indeks + KPI ikut dihitung di thread job, bukan saat rerun UI
+        with profiler.phase("schedule_index"):
+            index = schedule_index(schedule, capacity_per_ship,
+                                   kwargs.get("ships", SHIPS), kwargs.get("plan_days", PLAN_DAYS))
+        return {
+            "schedule": schedule,
+            "history": history,
+            "index": index,
+            "stats": stats,
+            "profile": profiler.to_dict(),
+        }
+    return work
+
+
+def _sweep(orders, capacities, kwargs):
+    def work(job):
+        curve = capacity_sweep(
+            orders, capacities, cancel=job._cancel,
+            progress=lambda done, total, row: job._report(done, total, row["penalty"]), **kwargs,
+        )
+        return {"curve": curve}
+    return work
+
+
+class JobRunner:
+    def __init__(self, max_jobs=32):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, orders, capacity_per_ship, params=None, solver=pso_scheduler, **kwargs):
+        # `orders` sebaiknya snapshot (OrderStore.snapshot() / hasil
+        # SharedOrderStore.sync()) karena dibaca dari thread lain. `solver` berantarmuka seperti pso_scheduler
+        # (mis. local_search_scheduler); kwargs diteruskan ke sana.
+        job = OptimizationJob(uuid.uuid4().hex[:12], dict(params or {}, capacity=capacity_per_ship))
+        return self._start(job, _optimize(solver, orders, capacity_per_ship, kwargs))
+
+    def submit_sweep(self, orders, capacities, params=None, **kwargs):
+        # Capacity sweep sebagai job; hasil {"curve": DataFrame}, kwargs ke capacity_sweep
+        job = OptimizationJob(uuid.uuid4().hex[:12], dict(params or {}), kind="sweep")
+        return self._start(job, _sweep(orders, capacities, kwargs))
+
+    def _start(self, job, work):
+        job._thread = threading.Thread(target=job._run, args=(work,),
+                                       name=f"{job.kind}-job-{job.job_id}", daemon=True)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        job._thread.start()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def _prune(self):
+        # Buang job lama yang sudah selesai agar hasilnya tidak menumpuk di memori
+        finished = [job_id for job_id, job in self._jobs.items() if not job.running]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
@@ -0,0 +1,235 @@
+import time
+
+import numpy as np
+
+from engine import PLAN_DAYS, SHIPS, RunMonitor, compile_orders, decode_queue, schedule_cost, schedule_frame
+from profiling import Profiler
+
+
+# LOCAL SEARCH
+# Solver kedua di samping PSO. Mulai dari greedy first-fit-decreasing
+# (lihat `greedy_assignment`) dengan decoder yang sama, lalu diperbaiki dengan
+# neighbourhood move (order -> kapal/hari lain atau backlog) dan swap (tukar
+# dua order antar slot). Penugasan disimpan langsung (bukan permutasi), jadi
+# efek setiap move pada objektif schedule_cost dihitung O(1):
+#   - biaya per order (delay, telat prioritas, backlog) hanya bergantung pada
+#     hari order itu sendiri;
+#   - std muatan dijaga lewat jumlah dan jumlah kuadrat muatan semua slot
+#     (hari cadangan ikut sebagai slot bermuatan nol, sama seperti schedule_cost).
+# Satu iterasi = satu batch kandidat acak yang dievaluasi vektor, lalu kandidat
+# yang memperbaiki diterapkan berurutan dengan cek ulang skalar.
+
+LATE_PRIORITY_PENALTY = 5000000
+
+
+class _Assignment:
+    def __init__(self, compiled, capacity_per_ship, assigned_day, assigned_ship):
+        self.weight = compiled["weight"]
+        self.is_priority = compiled["is_priority"]
+        self.reject_penalty = compiled["reject_penalty"]
+        self.capacity = capacity_per_ship
+        self.n_ships = len(compiled["ships"])
+        self.plan_days = compiled["plan_days"]
+        # Slot = hari * n_ships + kapal; slot terakhir (n_slots) = BACKLOG
+        self.n_slots = self.plan_days * self.n_ships
+        self.n_stat = (self.plan_days + 1) * self.n_ships
+
+        assigned = assigned_day >= 0
+        self.slot = np.where(assigned, assigned_day * self.n_ships + assigned_ship, self.n_slots)
+        self.loads = np.bincount(self.slot, weights=self.weight, minlength=self.n_slots + 1)
+        self.loads[self.n_slots] = 0.0
+        self.order_cost = self.cost_at(np.arange(len(self.slot)), self.slot)
+        self.refresh()
+
+    def day_of(self, slot):
+        return np.where(slot < self.n_slots, slot // self.n_ships, -1)
+
+    def cost_at(self, orders, slot):
+        # Biaya order bila ditempatkan di `slot` (delay + telat prioritas, atau backlog)
+        day = self.day_of(slot)
+        return np.where(
+            day >= 0,
+            np.maximum(day, 0) * self.weight[orders] / 1000
+            + LATE_PRIORITY_PENALTY * (self.is_priority[orders] & (day > 0)),
+            self.reject_penalty[orders],
+        )
+
+    def refresh(self):
+        # Hitung ulang agregat dari nol (menghapus drift floating point)
+        planned = self.loads[:self.n_slots]
+        self.s1 = float(planned.sum())
+        self.s2 = float((planned ** 2).sum())
+        self.base = float(self.order_cost.sum())
+
+    def std(self, s1, s2):
+        m = self.n_stat
+        return np.sqrt(np.maximum(s2 / m - (s1 / m) ** 2, 0.0))
+
+    @property
+    def total(self):
+        return self.base + float(self.std(self.s1, self.s2)) / 1000
+
+    def move_delta(self, i, b):
+        # Delta objektif untuk memindah order i ke slot b; inf jika tidak muat
+        a = self.slot[i]
+        w = self.weight[i]
+        in_a, in_b = a < self.n_slots, b < self.n_slots
+        la, lb = self.loads[a], self.loads[b]
+        feasible = (a != b) & (~in_b | (lb + w <= self.capacity))
+
+        ds1 = w * (in_b.astype(float) - in_a)
+        ds2 = in_a * ((la - w) ** 2 - la ** 2) + in_b * ((lb + w) ** 2 - lb ** 2)
+        delta = (self.cost_at(i, b) - self.order_cost[i]
+                 + (self.std(self.s1 + ds1, self.s2 + ds2) - self.std(self.s1, self.s2)) / 1000)
+        return np.where(feasible, delta, np.inf)
+
+    def swap_delta(self, i, j):
+        # Delta objektif untuk menukar slot order i dan j; inf jika tidak muat
+        a, b = self.slot[i], self.slot[j]
+        wi, wj = self.weight[i], self.weight[j]
+        in_a, in_b = a < self.n_slots, b < self.n_slots
+        la, lb = self.loads[a], self.loads[b]
+        la_new, lb_new = la - wi + wj, lb - wj + wi
+        feasible = ((a != b) & (~in_a | (la_new <= self.capacity))
+                    & (~in_b | (lb_new <= self.capacity)))
+
+        ds1 = in_a * (wj - wi) + in_b * (wi - wj)
+        ds2 = in_a * (la_new ** 2 - la ** 2) + in_b * (lb_new ** 2 - lb ** 2)
+        delta = (self.cost_at(i, b) + self.cost_at(j, a) - self.order_cost[i] - self.order_cost[j]
+                 + (self.std(self.s1 + ds1, self.s2 + ds2) - self.std(self.s1, self.s2)) / 1000)
+        return np.where(feasible, delta, np.inf)
+
+    def _place(self, i, b):
+        a = self.slot[i]
+        w = self.weight[i]
+        if a < self.n_slots:
+            self.s1 -= w
+            self.s2 += (self.loads[a] - w) ** 2 - self.loads[a] ** 2
+            self.loads[a] -= w
+        if b < self.n_slots:
+            self.s1 += w
+            self.s2 += (self.loads[b] + w) ** 2 - self.loads[b] ** 2
+            self.loads[b] += w
+        cost = float(self.cost_at(i, b))
+        self.base += cost - self.order_cost[i]
+        self.order_cost[i] = cost
+        self.slot[i] = b
+
+    def apply_move(self, i, b):
+        self._place(i, b)
+
+    def apply_swap(self, i, j):
+        # Lewat backlog agar kapasitas sementara tidak dicek di tengah swap
+        a, b = self.slot[i], self.slot[j]
+        self._place(i, self.n_slots)
+        self._place(j, a)
+        self._place(i, b)
+
+
+def greedy_assignment(compiled, capacity_per_ship):
+    # First-fit-decreasing dengan decoder PSO, prioritas selalu di depan. Dua
+    # urutan didecode sekaligus (sebagai dua partikel) dan yang termurah dipakai:
+    # terberat dulu (packing terpadat) dan denda backlog per kg terbesar dulu.
+    density = compiled["reject_penalty"] / np.maximum(compiled["weight"], 1)
+    not_prio = ~compiled["is_priority"]
+    queue = np.stack([
+        np.lexsort((-compiled["weight"], not_prio)),
+        np.lexsort((-compiled["weight"], -density, not_prio)),
+    ])
+    assigned_day, assigned_ship, ship_loads = decode_queue(queue, compiled, capacity_per_ship)
+    best = int(schedule_cost(compiled, queue, assigned_day, ship_loads).argmin())
+
+    day = np.empty(queue.shape[1], dtype=np.intp)
+    ship = np.empty(queue.shape[1], dtype=np.intp)
+    day[queue[best]] = assigned_day[best]
+    ship[queue[best]] = assigned_ship[best]
+    return day, ship
+
+
+def improve(state, rng, moves):
+    # Satu batch: `moves` kandidat move + `moves` kandidat swap acak.
+    # Return jumlah kandidat yang diterapkan.
+    n = len(state.slot)
+    move_i = rng.integers(n, size=moves)
+    move_b = rng.integers(state.n_slots + 1, size=moves)
+    swap_i = rng.integers(n, size=moves)
+    swap_j = rng.integers(n, size=moves)
+
+    # Separuh swap diarahkan backlog <-> terjadwal: pasangan acak murni hampir
+    # selalu sama-sama terjadwal (atau sama-sama backlog) pada antrian besar
+    backlog = np.flatnonzero(state.slot == state.n_slots)
+    if 0 < len(backlog) < n:
+        planned = np.flatnonzero(state.slot < state.n_slots)
+        half = moves // 2
+        swap_i[:half] = backlog[rng.integers(len(backlog), size=half)]
+        swap_j[:half] = planned[rng.integers(len(planned), size=half)]
+
+    deltas = np.concatenate([state.move_delta(move_i, move_b), state.swap_delta(swap_i, swap_j)])
+    candidates = np.flatnonzero(deltas < 0)
+    applied = 0
+    for k in candidates[np.argsort(deltas[candidates], kind='stable')]:
+        # Cek ulang: kandidat sebelumnya bisa mengubah muatan/agregat
+        if k < moves:
+            i, b = move_i[k], move_b[k]
+            if state.move_delta(i, b) < 0:
+                state.apply_move(i, b)
+                applied += 1
+        else:
+            i, j = swap_i[k - moves], swap_j[k - moves]
+            if state.swap_delta(i, j) < 0:
+                state.apply_swap(i, j)
+                applied += 1
+    return applied
+
+
+def local_search_scheduler(orders, capacity_per_ship, iterations=200, moves_per_iteration=2048,
+                           seed=None, progress=None, progress_interval=0.25,
+                           time_limit=None, patience=None, tol=0.0, stats=None,
+                           ships=SHIPS, plan_days=PLAN_DAYS, profiler=None, cancel=None):
+    # Antarmuka sama dengan pso_scheduler (return (schedule_df, loss_history),
+    # stats / progress / cancel / profiler dengan arti yang sama) agar bisa
+    # dipilih bergantian dari dashboard dan benchmark.
+    started = time.monotonic()
+    if not orders: return [], []
+    if profiler is None:
+        profiler = Profiler()
+    with profiler.phase("compile"):
+        compiled = compile_orders(orders, ships, plan_days)
+    with profiler.phase("greedy"):
+        day, ship = greedy_assignment(compiled, capacity_per_ship)
+        state = _Assignment(compiled, capacity_per_ship, day, ship)
+
+    rng = np.random.default_rng(seed)
+    loss_history = []
+    stop_reason = None
+    done = 0
+    monitor = RunMonitor(started, iterations, time_limit, patience, tol,
+                         cancel, progress, progress_interval, profiler)
+    while stop_reason is None:
+        with profiler.phase("optimize"):
+            applied = improve(state, rng, moves_per_iteration)
+            state.refresh()
+        # Kandidat move/swap (delta O(1)), bukan evaluasi jadwal penuh seperti
+        # counter "evaluations" PSO, jadi dihitung terpisah
+        profiler.count("candidate_moves", 2 * moves_per_iteration)
+        profiler.count("applied_moves", applied)
+        loss_history.append(state.total)
+        done += 1
+        stop_reason = monitor.check(done, loss_history)
+
+    with profiler.phase("build_schedule"):
+        assigned_day = state.day_of(state.slot)
+        assigned_ship = np.where(assigned_day >= 0, state.slot % state.n_ships, 0)
+        # Urutan baris: hari, kapal, prioritas dulu; backlog di akhir
+        queue = np.lexsort((~compiled["is_priority"], assigned_ship,
+                            np.where(assigned_day >= 0, assigned_day, plan_days)))
+        schedule = schedule_frame(orders, compiled, queue, assigned_day[queue], assigned_ship[queue])
+
+    if stats is not None:
+        stats.update({
+            "stop_reason": stop_reason,
+            "iterations": done,
+            "elapsed_s": time.monotonic() - started,
+            "best_loss": loss_history[-1],
+        })
+    return schedule, loss_history
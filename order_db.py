@@ -0,0 +1,345 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from order_store import DEFAULTS, FIELDS, NUMERIC_FIELDS, TEXT_FIELDS, OrderStore
+
+
+# ORDER DATABASE
+# Antrian order persisten yang dipakai bersama oleh semua sesi (SQLite, mode
+# WAL: banyak pembaca + satu penulis tanpa saling blok). Satu replika
+# OrderStore per proses (`SharedOrderStore`) menarik order berstatus queued
+# lewat `load_into` (streaming per chunk); sesi dan job hanya memegang
+# snapshot O(1) darinya, bukan salinan antrian sendiri. Order yang sudah
+# diberangkatkan ditandai `set_status(ids, "shipped")` dan keluar dari replika.
+# Snapshot Parquet (opsional, butuh pyarrow) untuk backup / analitik:
+#   python order_db.py snapshot backup.parquet
+#   python order_db.py restore backup.parquet --replace
+
+DEFAULT_PATH = os.environ.get("ORDER_DB_PATH", "orders.db")
+DEFAULT_BACKEND = os.environ.get("ORDER_DB_BACKEND", "sqlite")
+STATUSES = ["queued", "scheduled", "shipped"]
+QUEUED = "queued"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    client TEXT NOT NULL DEFAULT '',
+    item TEXT NOT NULL DEFAULT '',
+    type TEXT NOT NULL DEFAULT '',
+    qty INTEGER NOT NULL DEFAULT 0,
+    weight REAL NOT NULL DEFAULT 0,
+    dest TEXT NOT NULL DEFAULT '',
+    total REAL NOT NULL DEFAULT 0,
+    eta INTEGER NOT NULL DEFAULT 0,
+    is_priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued'
+);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status, id);
+CREATE INDEX IF NOT EXISTS idx_orders_priority ON orders (is_priority, id);
+CREATE INDEX IF NOT EXISTS idx_orders_dest ON orders (dest, id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('next_id', 1), ('revision', 0), ('generation', 0), ('status_epoch', 0);
+"""
+
+
+class OrderDatabase:
+    def __init__(self, path=DEFAULT_PATH, batch_size=5000):
+        self.path = path
+        self.batch_size = batch_size
+        # Satu koneksi per thread (Streamlit menjalankan sesi di thread berbeda)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return _Transaction(conn)
+
+    def _meta(self, conn, key):
+        return conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def _bump(self, conn, key, n=1):
+        conn.execute("UPDATE meta SET value = value + ? WHERE key = ?", (n, key))
+
+    @property
+    def revision(self):
+        # Naik setiap ada penulisan; dipakai sesi untuk tahu kapan harus sync
+        with self._connection() as conn:
+            return self._meta(conn, "revision")
+
+    @property
+    def generation(self):
+        # Naik setiap `clear`; replika dengan generation lama harus dimuat ulang
+        with self._connection() as conn:
+            return self._meta(conn, "generation")
+
+    @property
+    def status_epoch(self):
+        # Naik setiap `set_status`; replika antrian menyaring ulang order lamanya
+        with self._connection() as conn:
+            return self._meta(conn, "status_epoch")
+
+    def insert(self, orders, status="queued"):
+        # Bulk insert dari list of dict atau dict of columns (format yang sama
+        # dengan OrderStore.extend). Order tanpa id (atau id 0) mendapat id
+        # berurutan; id tidak pernah dipakai ulang, juga setelah `clear`.
+        if isinstance(orders, dict):
+            n = len(orders["weight"])
+            columns = {name: orders.get(name) for name in FIELDS}
+        else:
+            n = len(orders)
+            columns = {name: [o.get(name, DEFAULTS[name]) for o in orders] for name in FIELDS}
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+
+        ids = np.zeros(n, dtype=np.int64)
+        if columns["id"] is not None:
+            ids[:] = columns["id"]
+        missing = (ids == 0)
+
+        # Satu array per kolom; baris dirakit per batch lewat tolist() (objek
+        # Python native, jauh lebih cepat daripada iterasi baris DataFrame)
+        names = [name for name in FIELDS if name != "id"]
+        arrays = []
+        for name in names:
+            values = columns[name]
+            if values is None:
+                arrays.append(np.full(n, DEFAULTS[name], dtype=object))
+            elif name in TEXT_FIELDS:
+                # Nilai hilang (None / NaN / kode kategori -1) memakai default,
+                # sama dengan OrderStore, bukan NULL yang ditolak skema
+                arrays.append(pd.Series(values, dtype=object).fillna(DEFAULTS[name]).to_numpy())
+            else:
+                arrays.append(np.asarray(values, dtype=NUMERIC_FIELDS[name]))
+        arrays.append(np.full(n, status, dtype=object))
+
+        sql = f"INSERT INTO orders (id, {', '.join(names)}, status) VALUES ({', '.join('?' * (len(names) + 2))})"
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            next_id = self._meta(conn, "next_id")
+            ids[missing] = np.arange(next_id, next_id + int(missing.sum()))
+            for start in range(0, n, self.batch_size):
+                batch = [arr[start:start + self.batch_size].tolist() for arr in [ids, *arrays]]
+                conn.executemany(sql, zip(*batch))
+            new_next = max(next_id, int(ids.max()) + 1)
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'next_id'", (new_next,))
+            self._bump(conn, "revision")
+        return ids
+
+    def append(self, order):
+        return self.insert([order])[0]
+
+    def set_status(self, ids, status):
+        if status not in STATUSES:
+            raise ValueError(f"Status tidak dikenal: {status}")
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("UPDATE orders SET status = ? WHERE id = ?",
+                             ((status, int(i)) for i in ids))
+            self._bump(conn, "revision")
+            self._bump(conn, "status_epoch")
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM orders")
+            self._bump(conn, "revision")
+            self._bump(conn, "generation")
+
+    def _where(self, after_id=0, status=None, is_priority=None, dest=None):
+        # Filter memakai kolom ber-index (status / is_priority / dest, lalu id)
+        clauses, params = ["id > ?"], [int(after_id)]
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if is_priority is not None:
+            clauses.append("is_priority = ?")
+            params.append(int(is_priority))
+        if dest is not None:
+            clauses.append("dest = ?")
+            params.append(dest)
+        return " AND ".join(clauses), params
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self._connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM orders WHERE {where}", params).fetchone()[0]
+
+    def ids(self, **filters):
+        # Id order yang lolos filter (urut id), tanpa kolom lain
+        where, params = self._where(**filters)
+        with self._connection() as conn:
+            rows = conn.execute(f"SELECT id FROM orders WHERE {where} ORDER BY id", params).fetchall()
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    def iter_chunks(self, chunk_size=None, with_status=False, **filters):
+        # Stream order sebagai dict of columns per chunk (urut id). Kolom teks
+        # berupa pd.Categorical agar OrderStore.extend tidak loop per baris.
+        # with_status=True menambah kolom "status" (untuk snapshot / restore).
+        columns = FIELDS + ["status"] if with_status else FIELDS
+        where, params = self._where(**filters)
+        sql = f"SELECT {', '.join(columns)} FROM orders WHERE {where} ORDER BY id"
+        with self._connection() as conn:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size or self.batch_size)
+                if not rows:
+                    break
+                frame = pd.DataFrame.from_records(rows, columns=columns)
+                chunk = {}
+                for name in columns:
+                    if name in TEXT_FIELDS or name == "status":
+                        chunk[name] = pd.Categorical(frame[name])
+                    else:
+                        chunk[name] = frame[name].to_numpy(dtype=NUMERIC_FIELDS[name])
+                yield chunk
+
+    def load_into(self, store, after_id=0, **filters):
+        # Tarik order (id > after_id) ke OrderStore per chunk. Return jumlah baris.
+        loaded = 0
+        for chunk in self.iter_chunks(after_id=after_id, **filters):
+            store.extend(chunk)
+            loaded += len(chunk["weight"])
+        return loaded
+
+    def snapshot_parquet(self, path, **filters):
+        # Tulis snapshot per chunk (tidak memuat seluruh tabel ke memori),
+        # termasuk status order. `path` boleh file-like (mis. BytesIO).
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in self.iter_chunks(with_status=True, **filters):
+                table = pa.Table.from_pandas(pd.DataFrame(chunk), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return writer is not None
+
+    def import_parquet(self, path, status=QUEUED):
+        # Baca snapshot per batch; status per baris dipakai jika file punya
+        # kolom "status", selain itu `status`. Id dari file dipertahankan, jadi
+        # restore ke database yang sudah berisi id yang sama gagal (rollback
+        # per batch), kosongkan dulu dengan `clear`.
+        import pyarrow.parquet as pq
+
+        total = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=self.batch_size):
+            frame = batch.to_pandas()
+            groups = frame.groupby("status", sort=False, observed=True) if "status" in frame else [(status, frame)]
+            for group_status, part in groups:
+                columns = {name: part[name].to_numpy() for name in FIELDS if name in part}
+                total += len(self.insert(columns, str(group_status)))
+        return total
+
+
+class _Transaction:
+    # Context manager: rollback jika ada exception di dalam BEGIN, commit jika tidak
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# Backend penyimpanan: nama -> kelas. Backend lain cukup menyediakan
+# insert, append, set_status, clear, count, ids, iter_chunks, load_into dan
+# properti revision / generation / status_epoch dengan arti yang sama.
+BACKENDS = {
+    "sqlite": OrderDatabase,
+}
+
+
+def open_database(path=DEFAULT_PATH, backend=DEFAULT_BACKEND, **options):
+    return BACKENDS[backend](path, **options)
+
+
+def sync_store(database, store, state=None):
+    # Samakan replika OrderStore (order queued, urut id) dengan database.
+    # Order baru (id di atas id terakhir yang sudah dimuat) ditarik per chunk.
+    # Setelah set_status, order yang tidak lagi queued dibuang dengan retain;
+    # jika database di-clear (generation berubah) atau ada order lama yang
+    # kembali queued, replika dikosongkan lalu dimuat ulang.
+    # state: (generation, status_epoch) dari sync sebelumnya; return yang terbaru.
+    current = (database.generation, database.status_epoch)
+    if state is not None and state[0] == current[0] and state[1] != current[1] and len(store):
+        loaded = store.column("id")
+        queued = database.ids(status=QUEUED)
+        keep = np.isin(loaded, queued)
+        if np.count_nonzero(queued <= loaded[-1]) != np.count_nonzero(keep):
+            state = None
+        elif not keep.all():
+            store.retain(keep)
+    if state is None or state[0] != current[0]:
+        store.clear()
+    last_id = int(store.column("id")[-1]) if len(store) else 0
+    database.load_into(store, after_id=last_id, status=QUEUED)
+    return current
+
+
+class SharedOrderStore:
+    # Replika OrderStore tunggal untuk semua sesi dalam satu proses. `sync`
+    # menarik order baru di bawah lock (sesi lain menunggu, tidak ikut memuat)
+    # dan mengembalikan snapshot read-only yang tetap stabil walau replika
+    # terus bertambah, jadi sesi maupun job di thread lain tidak perlu copy.
+    def __init__(self, database):
+        self.database = database
+        self.store = OrderStore()
+        self.state = None
+        self.revision = None
+        self._lock = threading.Lock()
+
+    def sync(self):
+        with self._lock:
+            revision = self.database.revision
+            if revision != self.revision:
+                self.state = sync_store(self.database, self.store, self.state)
+                self.revision = revision
+            return self.store.snapshot()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot / restore database order (Parquet)")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    commands = parser.add_subparsers(dest="command", required=True)
+    snapshot = commands.add_parser("snapshot", help="Tulis order ke file Parquet")
+    snapshot.add_argument("path")
+    snapshot.add_argument("--status", choices=STATUSES, default=None, help="Hanya order dengan status ini")
+    restore = commands.add_parser("restore", help="Muat order dari file Parquet")
+    restore.add_argument("path")
+    restore.add_argument("--replace", action="store_true", help="Kosongkan database sebelum restore")
+    args = parser.parse_args(argv)
+
+    database = open_database(args.db, args.backend)
+    if args.command == "snapshot":
+        written = database.snapshot_parquet(args.path, status=args.status)
+        print(json.dumps({"path": args.path, "orders": database.count(status=args.status) if written else 0}))
+    else:
+        if args.replace:
+            database.clear()
+        print(json.dumps({"path": args.path, "restored": database.import_parquet(args.path)}))
+
+
+if __name__ == "__main__":
+    main()
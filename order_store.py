@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+
+# ORDER STORE
+# Penyimpanan order kolumnar: setiap field adalah NumPy array yang tumbuh per
+# chunk, field teks disimpan sebagai kode kategori (dictionary encoding).
+# Total tonase, revenue dan jumlah order dijaga berjalan sehingga dashboard
+# tidak perlu menjumlah ulang seluruh antrian setiap rerun.
+
+NUMERIC_FIELDS = {
+    "id": np.int64,
+    "qty": np.int32,
+    "weight": np.float64,
+    "total": np.float64,
+    "eta": np.int32,
+    "is_priority": np.bool_,
+}
+TEXT_FIELDS = ["client", "item", "type", "dest"]
+FIELDS = ["id", "client", "item", "type", "qty", "weight", "dest", "total", "eta", "is_priority"]
+DEFAULTS = {**{name: 0 for name in NUMERIC_FIELDS}, **{name: "" for name in TEXT_FIELDS}}
+
+
+class OrderStore:
+    def __init__(self, chunk_size=4096):
+        self.chunk_size = chunk_size
+        self.version = 0
+        self.next_id = 1
+        self.total_weight = 0.0
+        self.total_revenue = 0.0
+        self._size = 0
+        self._capacity = 0
+        self._data = {name: np.empty(0, dtype=dtype) for name, dtype in NUMERIC_FIELDS.items()}
+        self._data.update({name: np.empty(0, dtype=np.int32) for name in TEXT_FIELDS})
+        self._labels = {name: [] for name in TEXT_FIELDS}
+        self._codes = {name: {} for name in TEXT_FIELDS}
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= self._capacity:
+            return
+        chunks = -(-needed // self.chunk_size)
+        new_capacity = max(chunks * self.chunk_size, self._capacity * 2)
+        for name, arr in self._data.items():
+            grown = np.empty(new_capacity, dtype=arr.dtype)
+            grown[:self._size] = arr[:self._size]
+            self._data[name] = grown
+        self._capacity = new_capacity
+
+    def _encode(self, name, values):
+        if isinstance(values, pd.Categorical):
+            # Hanya kategori unik yang di-encode, lalu dipetakan lewat kode.
+            # Kode -1 (nilai hilang) jatuh ke elemen terakhir = nilai default
+            # field, bukan kategori terakhir
+            return self._encode(name, list(values.categories) + [DEFAULTS[name]])[values.codes]
+        codes = self._codes[name]
+        labels = self._labels[name]
+        out = np.empty(len(values), dtype=np.int32)
+        for k, value in enumerate(values):
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(labels)
+                labels.append(value)
+            out[k] = code
+        return out
+
+    def append(self, order):
+        return self.extend([order])[0]
+
+    def extend(self, orders):
+        # Bulk append dari list of dict atau dict of columns.
+        # Order tanpa id (atau id 0) mendapat id berurutan. Return array id.
+        if isinstance(orders, dict):
+            columns = orders
+            n = len(columns["weight"])
+        else:
+            n = len(orders)
+            columns = {name: [o.get(name, DEFAULTS[name]) for o in orders] for name in FIELDS}
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+
+        ids = np.zeros(n, dtype=np.int64)
+        if columns.get("id") is not None:
+            ids[:] = columns["id"]
+        missing = (ids == 0)
+        ids[missing] = np.arange(self.next_id, self.next_id + int(missing.sum()))
+
+        self._reserve(n)
+        start, end = self._size, self._size + n
+        self._data["id"][start:end] = ids
+        for name, dtype in NUMERIC_FIELDS.items():
+            if name == "id":
+                continue
+            values = columns.get(name)
+            self._data[name][start:end] = 0 if values is None else np.asarray(values, dtype=dtype)
+        for name in TEXT_FIELDS:
+            values = columns.get(name)
+            self._data[name][start:end] = self._encode(name, [""] * n if values is None else values)
+
+        self._size = end
+        self.next_id = max(self.next_id, int(ids.max()) + 1)
+        self.total_weight += float(self._data["weight"][start:end].sum())
+        self.total_revenue += float(self._data["total"][start:end].sum())
+        self.version += 1
+        return ids
+
+    def clear(self):
+        # Versi tetap naik agar cache yang di-key dengan versi tidak tertukar
+        version = self.version
+        self.__init__(self.chunk_size)
+        self.version = version + 1
+
+    def retain(self, keep):
+        # Buang baris yang tidak ditandai `keep` (mask bool per baris); urutan,
+        # kamus label dan next_id tetap (id tidak dipakai ulang). Array baru
+        # dialokasikan, jadi snapshot yang berbagi array lama tetap utuh.
+        keep = np.asarray(keep, dtype=bool)
+        n = int(keep.sum())
+        for name, arr in self._data.items():
+            self._data[name] = arr[:self._size][keep]
+        self._size = self._capacity = n
+        self.total_weight = float(self.column("weight").sum())
+        self.total_revenue = float(self.column("total").sum())
+        self.version += 1
+        return n
+
+    def snapshot(self):
+        # View read-only O(1) atas baris yang ada sekarang, berbagi array dengan
+        # store ini. Aman karena store hanya menulis di atas _size (extend),
+        # mengganti array saat tumbuh / retain, dan clear membuat array baru.
+        # Kapasitas snapshot = ukurannya, jadi extend pada snapshot pun
+        # mengalokasikan array sendiri.
+        view = OrderStore(self.chunk_size)
+        view.version = self.version
+        view.next_id = self.next_id
+        view.total_weight = self.total_weight
+        view.total_revenue = self.total_revenue
+        view._size = view._capacity = self._size
+        view._data = {name: arr[:self._size] for name, arr in self._data.items()}
+        view._labels = {name: list(labels) for name, labels in self._labels.items()}
+        view._codes = {name: dict(codes) for name, codes in self._codes.items()}
+        return view
+
+    def column(self, name):
+        # View tanpa copy untuk field numerik / kode kategori
+        return self._data[name][:self._size]
+
+    def labels(self, name):
+        return np.array(self._labels[name], dtype=object)
+
+    def decoded(self, name):
+        if name in TEXT_FIELDS:
+            return self.labels(name)[self.column(name)]
+        return self.column(name)
+
+    def to_frame(self, rows=None, categorical=False):
+        # DataFrame untuk tampilan; `rows` opsional (indeks/slice) agar hanya
+        # baris yang dibutuhkan yang dibangun. categorical=True: kolom teks
+        # sebagai pd.Categorical di atas kamus label store (tanpa string per baris).
+        data = {}
+        for name in FIELDS:
+            col = self.column(name)
+            if rows is not None:
+                col = col[rows]
+            if name not in TEXT_FIELDS:
+                data[name] = col
+            elif categorical:
+                data[name] = pd.Categorical.from_codes(col, self.labels(name))
+            else:
+                data[name] = self.labels(name)[col]
+        return pd.DataFrame(data)
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+
+# Rute
+ROUTES = {
+    "Tanjung Priok (JKT)":  {"dist": 0,    "rate": 2500, "days": 1},
+    "Soekarno-Hatta (MKS)": {"dist": 1400, "rate": 4800, "days": 4},
+    "Semayang (BPN)":       {"dist": 1200, "rate": 4200, "days": 3},
+    "Belawan (MDN)":        {"dist": 1800, "rate": 5800, "days": 5},
+    "Jayapura (DJJ)":       {"dist": 3700, "rate": 9800, "days": 12}
+}
+
+# 3 KELAS UTAMA
+CLASS_TYPES = {
+    "📦 KELAS C (Kecil - 1 Ton)": 1000,
+    "📦 KELAS B (Sedang - 20 Ton)": 20000,
+    "📦 KELAS A (Besar - 25 Ton)": 25000
+}
+
+GOODS_TYPE = ["General Cargo", "Electronics", "Textile", "FMCG", "Automotive Parts"]
+PPN = 0.11
+
+PRIORITY_SURCHARGE = 5000000
+ELECTRONICS_SURCHARGE = 0.08
+
+CLIENTS = ["PT. Indofood", "Mayora Group", "Unilever Indo", "Astra Honda", "Semen Gresik", "Wings Food", "Erajaya", "Gudang Garam"]
+
+# Tabel lookup untuk harga vektor (indeks = kode kategori)
+ROUTE_NAMES = list(ROUTES)
+ROUTE_RATES = np.array([ROUTES[r]["rate"] for r in ROUTE_NAMES], dtype=float)
+ROUTE_DAYS = np.array([ROUTES[r]["days"] for r in ROUTE_NAMES], dtype=np.int32)
+CLASS_NAMES = list(CLASS_TYPES)
+CLASS_WEIGHTS = np.array([CLASS_TYPES[c] for c in CLASS_NAMES], dtype=float)
+
+
+# HELPER FUNCTIONS
+
+
+def get_quote(route, weight, goods, is_priority):
+    route_info = ROUTES[route]
+    base_price = route_info["rate"] * weight
+
+    surcharge = 0
+    if is_priority:
+        surcharge = PRIORITY_SURCHARGE
+    elif "Electronics" in goods:
+        surcharge = base_price * ELECTRONICS_SURCHARGE
+
+    subtotal = base_price + surcharge
+    tax = subtotal * PPN
+    grand_total = subtotal + tax
+    return subtotal, tax, grand_total, route_info["days"]
+
+
+def _category_codes(values, names):
+    # Kode integer dipakai langsung; string dipetakan lewat nilai unik saja
+    if isinstance(values, pd.Categorical):
+        lookup = np.array([names.index(v) for v in values.categories], dtype=np.intp)
+        return lookup[values.codes]
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        return values
+    uniques, inverse = np.unique(values, return_inverse=True)
+    lookup = np.array([names.index(v) for v in uniques], dtype=np.intp)
+    return lookup[inverse]
+
+
+def get_quotes(routes, weights, goods, is_priority):
+    # Versi batch get_quote: routes dan goods berupa nama atau kode indeks ke
+    # ROUTE_NAMES / GOODS_TYPE. Rumus sama persis dengan get_quote.
+    route_idx = _category_codes(routes, ROUTE_NAMES)
+    goods_idx = _category_codes(goods, GOODS_TYPE)
+    weights = np.asarray(weights, dtype=float)
+    is_priority = np.asarray(is_priority, dtype=bool)
+
+    is_electronics = np.array(["Electronics" in g for g in GOODS_TYPE])[goods_idx]
+    base_price = ROUTE_RATES[route_idx] * weights
+    surcharge = np.where(
+        is_priority,
+        PRIORITY_SURCHARGE,
+        np.where(is_electronics, base_price * ELECTRONICS_SURCHARGE, 0),
+    )
+
+    subtotal = base_price + surcharge
+    tax = subtotal * PPN
+    grand_total = subtotal + tax
+    return subtotal, tax, grand_total, ROUTE_DAYS[route_idx]
+
+
+def mock_data_gen(n=20, seed=None):
+    # Order sintetis sebagai dict of columns (langsung untuk OrderStore.extend).
+    # Kolom teks berupa pd.Categorical agar tidak ada loop per baris.
+    rng = np.random.default_rng(seed)
+    class_idx = rng.integers(0, len(CLASS_NAMES), n)
+    qty = rng.integers(1, 3, n)
+    weight = CLASS_WEIGHTS[class_idx] * qty
+    dest_idx = rng.integers(0, len(ROUTE_NAMES), n)
+    item_idx = rng.integers(0, len(GOODS_TYPE), n)
+
+    # Random priority (20% chance)
+    is_prio = rng.random(n) < 0.2
+
+    _, _, total, eta = get_quotes(dest_idx, weight, item_idx, is_prio)
+
+    return {
+        "id": np.zeros(n, dtype=np.int64),
+        "client": pd.Categorical.from_codes(rng.integers(0, len(CLIENTS), n), CLIENTS),
+        "item": pd.Categorical.from_codes(item_idx, GOODS_TYPE),
+        "type": pd.Categorical.from_codes(class_idx, CLASS_NAMES),
+        "qty": qty,
+        "weight": weight,
+        "dest": pd.Categorical.from_codes(dest_idx, ROUTE_NAMES),
+        "total": total,
+        "eta": eta,
+        "is_priority": is_prio,
+    }
@@ -0,0 +1,55 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+# PROFILER
+# Timer per fase + counter. Diukur per batch (bukan per order), jadi overhead-nya
+# hanya beberapa perf_counter per iterasi dan aman dibiarkan aktif.
+
+
+class Profiler:
+    def __init__(self):
+        self.timers = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += time.perf_counter() - start
+            self.calls[name] += 1
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def merge(self, profile):
+        # Gabungkan hasil to_dict() dari proses lain (mis. worker island)
+        for name, seconds in profile["timers"].items():
+            self.timers[name] += seconds
+        for name, n in profile["calls"].items():
+            self.calls[name] += n
+        for name, n in profile["counters"].items():
+            self.counters[name] += n
+
+    def to_dict(self):
+        derived = {}
+        evaluations = self.counters.get("evaluations", 0)
+        optimize = self.timers.get("optimize", 0.0)
+        if evaluations and optimize:
+            derived["evals_per_s"] = evaluations / optimize
+        moves = self.counters.get("candidate_moves", 0)
+        if moves and optimize:
+            derived["moves_per_s"] = moves / optimize
+        lookups = self.counters.get("cache_hits", 0) + self.counters.get("cache_misses", 0)
+        if lookups:
+            derived["cache_hit_rate"] = self.counters.get("cache_hits", 0) / lookups
+        return {
+            "timers": dict(self.timers),
+            "calls": dict(self.calls),
+            "counters": dict(self.counters),
+            "derived": derived,
+        }
@@ -0,0 +1,183 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine import PLAN_DAYS, SHIPS, calculate_logistics_kpi, make_fleet, pso_scheduler
+from local_search import local_search_scheduler
+from order_db import QUEUED, open_database
+from order_store import FIELDS, TEXT_FIELDS, OrderStore
+from pricing import mock_data_gen
+
+
+# ROLLING-HORIZON SIMULATOR
+# Replay aliran kedatangan order hari demi hari tanpa Streamlit. Setiap hari:
+# order baru masuk antrian, antrian direncanakan ulang (PSO di-warm-start dari
+# gbest hari sebelumnya, order lama memakai koordinat lamanya), muatan hari 1
+# diberangkatkan dan sisanya (hari 2..H dan BACKLOG) dibawa ke hari berikutnya.
+# State antrian adalah OrderStore kolumnar plus array hari kedatangan, jadi
+# pengiriman dan carry-over cukup satu mask per hari.
+#   python simulate.py --days 1000 --rate 60 --capacity 500 --out sim.csv
+
+# Solver yang bisa dipakai: nama -> (fungsi solver, kwargs tambahan)
+SOLVERS = {
+    "pso": (pso_scheduler, {"low_memory": True}),
+    "local-search": (local_search_scheduler, {}),
+}
+
+
+def poisson_arrivals(rate, seed=None):
+    # Aliran tak hingga: jumlah order per hari ~ Poisson(rate), isi order sintetis
+    rng = np.random.default_rng(seed)
+    while True:
+        yield mock_data_gen(int(rng.poisson(rate)), seed=int(rng.integers(2**32)))
+
+
+def replay_arrivals(store, per_day):
+    # Pecah antrian yang sudah ada (mis. dari database order) menjadi kedatangan
+    # harian `per_day` order, urut id
+    for start in range(0, len(store), per_day):
+        frame = store.to_frame(rows=slice(start, start + per_day), categorical=True)
+        yield {name: frame[name].array if name in TEXT_FIELDS else frame[name].to_numpy()
+               for name in FIELDS}
+
+
+def simulate(arrivals, capacity_per_ship, days=None, solver="pso", ships=SHIPS,
+             plan_days=PLAN_DAYS, seed=None, progress=None, cancel=None, ship=None, **kwargs):
+    # arrivals: iterable batch order per hari (format OrderStore.extend); simulasi
+    # berhenti saat arrivals habis atau setelah `days` hari. kwargs diteruskan ke
+    # solver (iterations, particles, ...). progress(day, row) dipanggil per hari;
+    # cancel (objek dengan is_set()) dicek per hari; ship(ids) dipanggil dengan
+    # id order yang diberangkatkan (mis. set_status ke database).
+    # Return DataFrame satu baris per hari simulasi.
+    scheduler, options = SOLVERS[solver]
+    options = dict(options, **kwargs)
+    if scheduler is pso_scheduler:
+        options["warm_start"] = {}
+    rng = np.random.default_rng(seed)
+
+    queue = OrderStore()
+    arrived = np.empty(0, dtype=np.int64)
+    rows = []
+    for day, batch in enumerate(arrivals, start=1):
+        if days is not None and day > days:
+            break
+        if cancel is not None and cancel.is_set():
+            break
+        n_new = len(queue.extend(batch))
+        arrived = np.concatenate([arrived, np.full(n_new, day)])
+
+        started = time.perf_counter()
+        stats = {}
+        if len(queue):
+            schedule, _ = scheduler(queue, capacity_per_ship, seed=int(rng.integers(2**32)),
+                                    stats=stats, ships=ships, plan_days=plan_days, **options)
+        else:
+            schedule = pd.DataFrame(columns=["id", "weight", "is_priority", "Day_Index", "Ship", "Penalty"])
+        plan_s = time.perf_counter() - started
+        service_level, priority_compliance, utilization, penalty = \
+            calculate_logistics_kpi(schedule, capacity_per_ship)
+
+        # Berangkatkan muatan hari 1, sisanya dibawa ke hari berikutnya
+        day_index = schedule["Day_Index"].to_numpy()
+        shipped_ids = schedule["id"].to_numpy()[day_index == 1]
+        shipped = np.isin(queue.column("id"), shipped_ids)
+        wait = day - arrived[shipped]
+        prio = queue.column("is_priority")
+        row = {
+            "day": day,
+            "arrivals": n_new,
+            "queue": len(queue),
+            "shipped": int(shipped.sum()),
+            "shipped_ton": float(queue.column("weight")[shipped].sum()) / 1000,
+            "backlog": int(np.count_nonzero(day_index == 99)),
+            "priority_waiting": int(np.count_nonzero(prio & ~shipped)),
+            "mean_wait_days": float(wait.mean()) if len(wait) else 0.0,
+            "max_age_days": int(day - arrived.min()) if len(arrived) else 0,
+            "service_level": float(service_level),
+            "priority_compliance": float(priority_compliance),
+            "utilization": float(utilization),
+            "penalty": float(penalty),
+            "plan_s": plan_s,
+            "iterations": stats.get("iterations", 0),
+        }
+        if ship is not None and len(shipped_ids):
+            ship(shipped_ids)
+        queue.retain(~shipped)
+        arrived = arrived[~shipped]
+        rows.append(row)
+        if progress is not None:
+            progress(day, row)
+    return pd.DataFrame(rows)
+
+
+def summarize(result, wall_s=None):
+    # Ringkasan seluruh simulasi untuk capacity planning / regresi throughput
+    if result.empty:
+        return {"days": 0}
+    summary = {
+        "days": len(result),
+        "orders_arrived": int(result["arrivals"].sum()),
+        "orders_shipped": int(result["shipped"].sum()),
+        "final_queue": int(result["queue"].iloc[-1] - result["shipped"].iloc[-1]),
+        "ton_per_day": float(result["shipped_ton"].mean()),
+        "mean_wait_days": float(np.average(result["mean_wait_days"], weights=result["shipped"]))
+        if result["shipped"].sum() else 0.0,
+        "max_age_days": int(result["max_age_days"].max()),
+        "mean_service_level": float(result["service_level"].mean()),
+        "mean_priority_compliance": float(result["priority_compliance"].mean()),
+        "mean_utilization": float(result["utilization"].mean()),
+        "plan_s_per_day": float(result["plan_s"].mean()),
+    }
+    if wall_s:
+        summary["wall_s"] = wall_s
+        summary["days_per_min"] = len(result) / wall_s * 60
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulasi rolling-horizon: kedatangan order harian dan replanning")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--rate", type=float, default=60, help="Rata-rata order masuk per hari")
+    parser.add_argument("--capacity", type=int, default=500, help="Kapasitas per kapal dalam ton")
+    parser.add_argument("--ships", type=int, default=3)
+    parser.add_argument("--plan-days", type=int, default=PLAN_DAYS)
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="pso")
+    parser.add_argument("--iterations", type=int, default=5, help="Iterasi solver per hari (warm start)")
+    parser.add_argument("--particles", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", default=None,
+                        help="Replay antrian dari database order (--rate order per hari) alih-alih order sintetis")
+    parser.add_argument("--mark-shipped", action="store_true",
+                        help="Dengan --db: tandai order yang diberangkatkan sebagai shipped di database")
+    parser.add_argument("--out", default=None, help="Simpan metrik harian ke CSV")
+    args = parser.parse_args(argv)
+
+    ship = None
+    if args.db:
+        database = open_database(args.db)
+        store = OrderStore()
+        database.load_into(store, status=QUEUED)
+        arrivals = replay_arrivals(store, max(1, int(args.rate)))
+        if args.mark_shipped:
+            ship = lambda ids: database.set_status(ids, "shipped")
+    else:
+        arrivals = poisson_arrivals(args.rate, args.seed)
+    options = {"iterations": args.iterations}
+    if args.solver == "pso":
+        options["particles"] = args.particles
+
+    started = time.perf_counter()
+    result = simulate(arrivals, args.capacity * 1000, days=args.days, solver=args.solver,
+                      ships=make_fleet(args.ships), plan_days=args.plan_days, seed=args.seed,
+                      ship=ship, **options)
+    summary = summarize(result, time.perf_counter() - started)
+    if args.out:
+        result.to_csv(args.out, index=False)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from engine import PLAN_DAYS, SHIPS, compile_orders, compress_orders, pso_scheduler, schedule_index
+
+
+# CAPACITY SWEEP
+# Menjalankan optimasi untuk serangkaian kapasitas kapal sekaligus dan
+# menghasilkan satu kurva KPI (service level, priority compliance, utilisasi,
+# penalty) per kapasitas. Kapasitas diurutkan lalu dibagi menjadi `workers`
+# segmen berurutan; segmen berjalan paralel di ProcessPool (data order dikirim
+# dan di-compile sekali per worker lewat initializer) dan di dalam segmen
+# setiap kapasitas di-warm-start dari gbest kapasitas tetangga sebelumnya.
+
+# Order, hasil compile dan event cancel per proses worker (lewat initializer,
+# bukan per task)
+_SWEEP_CONTEXT = {}
+
+
+def compile_sweep(orders, kwargs):
+    # Hasil compile tidak bergantung kapasitas: cukup sekali per sweep / worker
+    compiled = compile_orders(orders, kwargs.get("ships", SHIPS), kwargs.get("plan_days", PLAN_DAYS))
+    if kwargs.get("compress"):
+        compiled = compress_orders(compiled, blocks_per_class=kwargs.get("blocks_per_class", 4))
+    return compiled
+
+
+def _init_sweep_worker(orders, kwargs, cancel):
+    _SWEEP_CONTEXT["orders"] = orders
+    _SWEEP_CONTEXT["compiled"] = compile_sweep(orders, kwargs)
+    _SWEEP_CONTEXT["cancel"] = cancel
+
+
+def sweep_point(orders, capacity_per_ship, warm=None, ships=SHIPS, plan_days=PLAN_DAYS, **kwargs):
+    # Satu titik kurva. `warm` = entri memori warm start dari kapasitas tetangga
+    # ({"ids", "position"}); kwargs lain (compiled, cancel, ...) diteruskan ke
+    # pso_scheduler. Return (baris KPI, entri warm start kapasitas ini).
+    memory = {capacity_per_ship: warm} if warm is not None else {}
+    stats = {}
+    schedule, _ = pso_scheduler(orders, capacity_per_ship, warm_start=memory, stats=stats,
+                                ships=ships, plan_days=plan_days, **kwargs)
+    service_level, priority_compliance, utilization, penalty = \
+        schedule_index(schedule, capacity_per_ship, ships, plan_days)["kpi"]
+    row = {
+        "capacity_ton": capacity_per_ship / 1000,
+        "service_level": float(service_level),
+        "priority_compliance": float(priority_compliance),
+        "utilization": float(utilization),
+        "penalty": float(penalty),
+        "best_loss": stats["best_loss"],
+        "iterations": stats["iterations"],
+        "elapsed_s": stats["elapsed_s"],
+        "stop_reason": stats["stop_reason"],
+        "warm_started": warm is not None,
+    }
+    return row, memory.get(capacity_per_ship)
+
+
+def _sweep_task(capacity_per_ship, warm, kwargs):
+    return sweep_point(_SWEEP_CONTEXT["orders"], capacity_per_ship, warm, compiled=_SWEEP_CONTEXT["compiled"],
+                       cancel=_SWEEP_CONTEXT["cancel"], **kwargs)
+
+
+def capacity_sweep(orders, capacities, workers=None, progress=None, cancel=None, **kwargs):
+    # capacities dalam kg. workers: jumlah proses (None/1 = serial, satu rantai
+    # warm start penuh). progress(done, total, row) dipanggil per titik;
+    # cancel (objek dengan is_set()) diteruskan ke setiap titik yang sedang
+    # berjalan (di worker lewat Event proses) dan gelombang berikutnya tidak
+    # dimulai; titik yang terpotong tetap masuk kurva dengan stop_reason
+    # "cancelled". kwargs diteruskan ke pso_scheduler (iterations, particles,
+    # seed, ships, plan_days, ...). Return DataFrame satu baris per kapasitas,
+    # urut kapasitas.
+    capacities = sorted(set(capacities))
+    if not orders or not capacities:
+        return pd.DataFrame()
+
+    n_segments = max(1, min(workers or 1, len(capacities)))
+    segments = [list(seg) for seg in np.array_split(capacities, n_segments)]
+    warm = [None] * n_segments
+    rows = []
+
+    pool = compiled = stop = None
+    if n_segments > 1:
+        context = mp.get_context("spawn")
+        stop = context.Event()
+        pool = ProcessPoolExecutor(
+            max_workers=n_segments,
+            mp_context=context,
+            initializer=_init_sweep_worker,
+            initargs=(orders, kwargs, stop),
+        )
+    else:
+        compiled = compile_sweep(orders, kwargs)
+    try:
+        # Gelombang ke-k menjalankan kapasitas ke-k dari setiap segmen bersamaan
+        for wave in range(max(len(seg) for seg in segments)):
+            if cancel is not None and cancel.is_set():
+                break
+            active = [s for s, seg in enumerate(segments) if wave < len(seg)]
+            if pool is None:
+                results = [sweep_point(orders, segments[s][wave], warm[s], compiled=compiled,
+                                       cancel=cancel, **kwargs) for s in active]
+            else:
+                futures = [pool.submit(_sweep_task, segments[s][wave], warm[s], kwargs) for s in active]
+                pending = futures
+                while pending:
+                    if cancel is not None and cancel.is_set():
+                        stop.set()
+                    _, pending = wait(pending, timeout=0.1)
+                results = [f.result() for f in futures]
+            for s, (row, entry) in zip(active, results):
+                warm[s] = entry
+                rows.append(row)
+                if progress is not None:
+                    progress(len(rows), len(capacities), row)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values("capacity_ton").reset_index(drop=True)